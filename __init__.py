@@ -1,23 +1,62 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import inspect
 import logging
 import json
-from urllib.parse import urlparse
+import re
 
+import aiohttp
+import yaml
 from aiohttp.web import Request, Response
 
-from opsdroid.events import Message
-from opsdroid.matchers import match_regex, match_webhook
+from opsdroid.events import OpsdroidStarted
+from opsdroid.matchers import match_event, match_regex, match_webhook
 from opsdroid.skill import Skill
 
-# from jira import JIRA, JIRAError
-# from .jira_oauth import JiraOauth
+from . import confluence, templates
+from .client import HttpClient
+from .coalesce import DEFAULT_MAX_PENDING, Coalescer
+from .dedup import IDENTIFIER_HEADER, Deduplicator, RedisClaims, event_identity
+from .delivery import DEFAULT_BATCH, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, Delivery
+from .filters import unknown_patterns
+from .issues import JiraLookupError, render_card
+from .metrics import Metrics, NullMetrics
+from .payload import (
+    DEFAULT_MAX_BODY_SIZE,
+    SELF_PATHS,
+    PayloadTooLarge,
+    event_project,
+    lookup,
+    read_body,
+)
+from .ratelimit import SourceLimiter
+from .spool import (
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_RETRY,
+    DEFAULT_SPOOL_AGE,
+    DEFAULT_SPOOL_SIZE,
+    Spool,
+)
+from .tenants import INHERITED, SEPARATOR, Instance, hostname
+from .templates import register_template
+from .verify import valid_token
+from .workers import BLOCK, EventQueue
 
 log = logging.getLogger(name="errbot.plugins.atlassian")
 
 GLOBAL_ROUTE = "atlassian_global_route"
+# Seconds between checks for routes changed by other replicas.
+DEFAULT_ROUTE_REFRESH = 30.0
 DEFAULT_EVENTS = "atlassian_default_events"
-ROUTES = "atlassian_routes"
+
+# Options that can be appended to a route as key=value, with their type.
+OPTION_TYPES = {
+    "debounce": float,
+    "rate": float,
+    "burst": int,
+    "batch": int,
+}
 
 ATLASSIAN_EVENTS = [
     "attachment_created",
@@ -51,7 +90,8 @@ ATLASSIAN_EVENTS = [
     "group_created",
     "group_removed",
     "issue_property_set",
-    "issue_property_deleted" "issuelink_created",
+    "issue_property_deleted",
+    "issuelink_created",
     "issuelink_deleted",
     "jira:issue_created",
     "jira:issue_deleted",
@@ -113,6 +153,8 @@ ATLASSIAN_EVENTS = [
     "worklog_updated",
 ]
 
+KNOWN_EVENTS = frozenset(ATLASSIAN_EVENTS)
+
 GLOBAL_EVENTS = [
     "blog_created",
     "blog_removed",
@@ -144,98 +186,593 @@ HELP_MSG = (
 
 PROJECT_UNKNOWN = "The project {0} is unknown to me."
 EVENT_UNKNOWN = "Unknown event {0}, skipping."
+OPTION_INVALID = "Invalid route option {0}, skipping."
+INSTANCE_UNKNOWN = "Unknown instance in {0}, skipping."
+EVENTS_INVALID = "No valid events for {0} to {1}, skipping."
+EVENTS_MALFORMED = "Events for {0} to {1} are not a list of names, skipping."
+
+# Arguments of the route command, also one line of the import command.
+ROUTE_SPEC = (
+    r"(?P<project>\S+) (?P<room>\S+)"
+    r"(?:\s+(?P<events>[^\s=]+))?(?P<options>(?:\s+\w+=\S+)*)"
+)
+ROUTE_LINE = re.compile(ROUTE_SPEC)
+
+# Upper bound for messages rendered by msg_generic, see generic_max_length.
+GENERIC_MAX_LENGTH = 500
+
+# Where msg_generic looks for the well-known fields of a payload, in order.
+GENERIC_FIELDS = (
+    ("user", (("user", "displayName"), ("user", "name"), ("userAccountId",))),
+    (
+        "key",
+        (("issue", "key"), ("project", "key"), ("space", "key"), ("page", "spaceKey")),
+    ),
+    (
+        "title",
+        (
+            ("issue", "fields", "summary"),
+            ("page", "title"),
+            ("blog", "title"),
+            ("attachment", "fileName"),
+            ("sprint", "name"),
+            ("version", "name"),
+            ("board", "name"),
+            ("space", "name"),
+            ("project", "name"),
+        ),
+    ),
+    ("url", (("page", "self"), ("blog", "self"), ("space", "self"), ("self",))),
+)
+
+ISSUE_KEY = re.compile(r"\b[A-Z]+-[0-9]+\b")
+
+# Webhook events after which a cached issue card is outdated, including the
+# None cached for a key that was looked up before its issue was created.
+ISSUE_CHANGED_EVENTS = frozenset(
+    ("jira:issue_created", "jira:issue_updated", "jira:issue_deleted")
+)
+
+# Webhook events the issue mirror is kept up to date with.
+MIRRORED_EVENTS = ISSUE_CHANGED_EVENTS
 
 README = "https://github.com/mayflower/err-atlassian/blob/master/README.rst"
 
 
-class JiraNeedsAuthorization(Exception):
-    pass
+# Formatters registered through register_formatter, by event name.
+FORMATTERS = {}
+
+# Compiled dispatch tables, by skill class.
+_DISPATCH_TABLES = {}
+
+
+def register_formatter(*event_types):
+    """Register ``fn(body, project, event_type)`` as formatter for events.
+
+    Works for webhook events as well as for the issue sub-events found in
+    ``issue_event_type_name`` and takes precedence over the formatters
+    defined on the skill, so sites can customize messages without
+    subclassing it.
+    """
+
+    def decorator(fn):
+        for event_type in event_types:
+            FORMATTERS[event_type] = fn
+        _DISPATCH_TABLES.clear()
+        return fn
+
+    return decorator
+
+
+def _event_name(method_name):
+    """Map a formatter name such as msg_jira_issue_created to its event."""
+    event_type = method_name[len("msg_") :]
+    if event_type.startswith("jira_"):
+        event_type = "jira:" + event_type[len("jira_") :]
+    return event_type
+
+
+def _method_formatter(cls, name):
+    fn = getattr(cls, name)
+    if isinstance(inspect.getattr_static(cls, name), staticmethod):
+        return lambda skill, body, project, event_type: fn(body, project)
+    return lambda skill, body, project, event_type: fn(skill, body, project)
+
+
+def _external_formatter(fn):
+    return lambda skill, body, project, event_type: fn(body, project, event_type)
+
+
+def _event_names(events):
+    """Tell whether ``events`` of an import is a name, names or missing."""
+    if events is None or isinstance(events, str):
+        return True
+    return isinstance(events, list) and all(isinstance(e, str) for e in events)
+
+
+def _truncate(text, length):
+    return text if len(text) <= length else text[: max(length - 1, 0)] + "…"
 
 
 class Atlassian(Skill):
+    def __init__(self, opsdroid, config, *args, **kwargs):
+        super().__init__(opsdroid, config, *args, **kwargs)
+        if self.config.get("template_engine"):
+            templates.use_engine(self.config["template_engine"])
+        for name, source in self.config.get("templates", {}).items():
+            register_template(name, source)
+        self.max_body_size = self.config.get("max_body_size", DEFAULT_MAX_BODY_SIZE)
+        self._sources = None
+        if self.config.get("source_rate"):
+            self._sources = SourceLimiter(
+                self.config["source_rate"],
+                burst=self.config.get("source_burst", 1),
+                maxsize=self.config.get("source_max_tracked", 10000),
+            )
+        self._dedup = None
+        if self.config.get("deduplicate"):
+            shared = None
+            if self.config.get("deduplicate_redis"):
+                shared = RedisClaims(self.config["deduplicate_redis"])
+            self._dedup = Deduplicator(
+                maxsize=self.config.get("deduplicate_size", 10000),
+                ttl=self.config.get("deduplicate_ttl", 3600),
+                shared=shared,
+            )
+            self._on_shutdown(self._dedup.close)
+        self._metrics = NullMetrics()
+        if self.config.get("metrics"):
+            self._metrics = Metrics(
+                self.config.get("metrics_max_projects", 100), events=KNOWN_EVENTS
+            )
+            self._add_route(
+                "GET", "/skill/{0}/metrics".format(self.config["name"]), self.metrics
+            )
+        spool = None
+        if self.config.get("spool_path"):
+            spool = Spool(
+                self.config["spool_path"],
+                max_size=self.config.get("spool_max_size", DEFAULT_SPOOL_SIZE),
+                max_age=self.config.get("spool_max_age", DEFAULT_SPOOL_AGE),
+                retry=self.config.get("spool_retry", DEFAULT_RETRY),
+                max_backoff=self.config.get("spool_max_backoff", DEFAULT_MAX_BACKOFF),
+            )
+        self._delivery = Delivery(
+            opsdroid,
+            concurrency=self.config.get("send_concurrency", DEFAULT_CONCURRENCY),
+            timeout=self.config.get("send_timeout", DEFAULT_TIMEOUT),
+            limits=self._room_limits,
+            spool=spool,
+        )
+        self._queue = None
+        if self.config.get("queue_events"):
+            self._queue = EventQueue(
+                self._process,
+                maxsize=self.config.get("queue_size", 1000),
+                workers=self.config.get("queue_workers", 4),
+                overflow=self.config.get("queue_overflow", BLOCK),
+            )
+            self._on_shutdown(self._drain_queue)
+        self._coalescer = Coalescer(
+            self._send_digest,
+            max_pending=self.config.get("debounce_max_pending", DEFAULT_MAX_PENDING),
+        )
+        self._on_shutdown(self._coalescer.flush_all)
+        # Shutdown hooks run in order: events still queued and pending
+        # digests go out first, then messages held back by rate limits, and
+        # only then is the spool closed.
+        self._on_shutdown(self._delivery.flush_all)
+        self._on_shutdown(self._delivery.close)
+        self._http = HttpClient(
+            limit=self.config.get("http_limit", 100),
+            limit_per_host=self.config.get("http_limit_per_host", 10),
+            keepalive_timeout=self.config.get("http_keepalive", 30),
+            timeout=self.config.get("http_timeout", 10),
+        )
+        self._on_shutdown(self._http.close)
+
+        self._refresher = None
+        self._on_shutdown(self._stop_refresh)
+
+        self._default = self._instance(None, self.config)
+        self._default.generic_max_length = self.config.get(
+            "generic_max_length", GENERIC_MAX_LENGTH
+        )
+        self._instances = {}
+        for name, instance_config in self.config.get("instances", {}).items():
+            inherited = {
+                key: self.config[key] for key in INHERITED if key in self.config
+            }
+            instance = self._instance(name, dict(inherited, **instance_config))
+            if instance.generic_max_length is None:
+                instance.generic_max_length = self._default.generic_max_length
+            self._instances[name] = instance
+        self._by_host = {
+            host: instance
+            for instance in [self._default, *self._instances.values()]
+            for host in instance.hosts
+        }
+        if self._instances:
+            self._add_route(
+                "POST",
+                "/skill/{0}/atlassian/{{instance}}".format(self.config["name"]),
+                self.receive_instance,
+            )
+
+    def _instance(self, name, config):
+        return Instance(
+            name, config, self.opsdroid.memory, self._http, KNOWN_EVENTS, GLOBAL_EVENTS
+        )
+
+    def _all_instances(self):
+        yield self._default
+        yield from self._instances.values()
+
+    def _split_project(self, project):
+        """Split ``instance/KEY`` into (instance, KEY), instance None if unknown.
+
+        Keys without an instance belong to the default instance.
+        """
+        name, separator, key = project.rpartition(SEPARATOR)
+        if not separator:
+            return self._default, project
+        return self._instances.get(name), key
+
+    def _detect_instance(self, body):
+        """Attribute an event posted to the shared webhook by its URLs."""
+        url = lookup(body, SELF_PATHS)
+        if url:
+            return self._by_host.get(hostname(url), self._default)
+        return self._default
+
+    def _room_limits(self, room):
+        """Return the (rate, burst, batch) limits of a room, None if unlimited."""
+        options = {}
+        for instance in self._all_instances():
+            for name, value in instance.routing.room_options(room).items():
+                options[name] = min(options.get(name, value), value)
+        rate = options.get("rate", self.config.get("room_rate"))
+        if not rate:
+            return None
+        return (
+            rate,
+            options.get("burst", self.config.get("room_burst", 1)),
+            options.get("batch", self.config.get("room_batch", DEFAULT_BATCH)),
+        )
+
+    def _on_shutdown(self, callback):
+        """Await ``callback`` when opsdroid stops its web server."""
+        web_server = getattr(self.opsdroid, "web_server", None)
+        if web_server is not None:
+            web_server.web_app.on_shutdown.append(lambda app: callback())
+
+    def _webhook_token_valid(self, request):
+        """Check the Bearer token opsdroid requires of webhooks, if any."""
+        web_server = getattr(self.opsdroid, "web_server", None)
+        token = getattr(web_server, "config", {}).get("webhook-token")
+        if token is None:
+            return True
+        scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+        return scheme == "Bearer" and valid_token(token, given.strip())
+
+    def _add_route(self, method, path, handler):
+        """Serve ``handler`` from opsdroid's web server next to the webhook."""
+        web_server = getattr(self.opsdroid, "web_server", None)
+        if web_server is not None:
+            web_server.web_app.router.add_route(method, path, handler)
+
+    async def metrics(self, request):
+        """Expose the pipeline metrics in the Prometheus text format.
+
+        Like the webhooks, they require the ``webhook-token`` of opsdroid's
+        web server if one is set.
+        """
+        if not self._webhook_token_valid(request):
+            log.warning(f"Unauthorized metrics request from {request.remote}.")
+            return Response(status=403)
+        return Response(
+            text=self._metrics.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def _drain_queue(self):
+        await self._queue.drain(self.config.get("queue_drain_timeout", 10))
+
+    async def _load_routing(self):
+        """Compile the persisted routes into the in-memory routing tables."""
+        global_route = await self.opsdroid.memory.get(GLOBAL_ROUTE)
+        defaults = await self.opsdroid.memory.get(DEFAULT_EVENTS)
+        for instance in self._all_instances():
+            instance.routing.load(
+                await instance.route_store.load(), global_route, defaults
+            )
+
+    @staticmethod
+    def _refresh_project(instance, project, shard):
+        """Recompile a project if its persisted shard is newer than ours."""
+        if shard["version"] != instance.routing.version(project):
+            instance.routing.set_shard(project, shard)
+
+    @staticmethod
+    def _parse_options(text):
+        """Parse ``key=value`` route options, returning (options, invalid)."""
+        options, invalid = {}, []
+        for option in (text or "").split():
+            name, _, value = option.partition("=")
+            try:
+                options[name] = OPTION_TYPES[name](value)
+            except (KeyError, ValueError):
+                invalid.append(option)
+        return options, invalid
+
+    @match_event(OpsdroidStarted)
+    async def atlassian_startup(self, event):
+        """Load the routing table and start the workers once opsdroid is up."""
+        await self._load_routing()
+        self._delivery.start()
+        if self._queue is not None:
+            self._queue.start()
+        interval = self.config.get("route_refresh", DEFAULT_ROUTE_REFRESH)
+        if interval and self._refresher is None:
+            self._refresher = asyncio.ensure_future(self._refresh_routes(interval))
+
+    async def _refresh_routes(self, interval):
+        """Pick up routes changed by other replicas sharing the memory."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._sync_routing()
+            except Exception as exc:
+                log.warning(f"Refreshing routes failed: {exc!r}")
+
+    async def _sync_routing(self):
+        global_route = await self.opsdroid.memory.get(GLOBAL_ROUTE)
+        defaults = await self.opsdroid.memory.get(DEFAULT_EVENTS)
+        for instance in self._all_instances():
+            shards = await instance.route_store.load()
+            changed = instance.routing.refresh(shards, global_route, defaults)
+            if changed:
+                log.info(f"Refreshed the routes of {changed} project(s).")
+
+    async def _stop_refresh(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
     @match_regex(
         r"!atlassian defaults(?:\s+(?P<events>\S+))?", matching_condition="fullmatch"
     )
     async def atlassian_defaults(self, message):
         """Get or set what events are relayed by default for new routes."""
-        events = message.entities.get("events", {}).get("value", "").split(",")
+        events = message.entities.get("events", {}).get("value")
 
         if events:
-            for event in events:
-                if event not in ATLASSIAN_EVENTS:
-                    await message.respond(EVENT_UNKNOWN.format(event))
-                    return
+            events = events.split(",")
+            for event in unknown_patterns(events, KNOWN_EVENTS):
+                await message.respond(EVENT_UNKNOWN.format(event))
+                return
 
             await self.opsdroid.memory.put(DEFAULT_EVENTS, events)
+            for instance in self._all_instances():
+                instance.routing.defaults = events
             await message.respond(
                 "Done. Newly created routes will default to "
                 "receiving: {0}.".format(" ".join(events))
             )
         else:
-            events = await self.opsdroid.memory.get(DEFAULT_EVENTS)
+            events = await self.opsdroid.memory.get(DEFAULT_EVENTS) or ATLASSIAN_EVENTS
             await message.respond(
                 "Events routed by default: " "{0}.".format(" ".join(events))
             )
 
-    @match_regex(
-        r"!atlassian route (?P<project>\S+) (?P<room>\S+)(?:\s+(?P<events>\S+))?",
-        matching_condition="fullmatch",
-    )
+    @match_regex(r"!atlassian route " + ROUTE_SPEC, matching_condition="fullmatch")
     async def atlassian_route(self, message):
         """Map a project to a chatroom, essentially creating a route.
 
         This takes two or three arguments: author/project, a chatroom and
-        optionally a list of events.
+        optionally a list of events, followed by any number of key=value
+        route options such as debounce=30. Several projects and chatrooms
+        can be given separated by commas, creating a route for each pair.
 
         If you do not specify a list of events the route will default to
         receiving the events configured as 'default_events'.
         """
-        project = message.entities["project"]["value"]
-        room = message.entities["room"]["value"]
-        events = message.entities.get("events", {}).get("value")
-
-        routes = await self.opsdroid.memory.get(ROUTES)
-        routes = {} if routes is None else routes
-
-        if events:
-            events = events.split(",")
-            for event in events:
-                if event not in ATLASSIAN_EVENTS and event != "*":
-                    await message.respond(EVENT_UNKNOWN.format(event))
-                    events.remove(event)
-        else:
-            events = await self.opsdroid.memory.get(DEFAULT_EVENTS)
-            if not events:
-                events = ATLASSIAN_EVENTS
+        projects = message.entities["project"]["value"].split(",")
+        rooms = message.entities["room"]["value"].split(",")
+        warnings = []
+        events = self._route_events(
+            message.entities.get("events", {}).get("value"), warnings
+        )
+        options = self._route_options(
+            message.entities.get("options", {}).get("value"), warnings
+        )
 
-        project_routes = routes.get(project, {})
-        project_routes[room] = events
-        routes[project] = project_routes
-        log.debug(f"project_routes configured {project_routes}")
-        log.debug(f"routes configured {routes}")
+        if events is None:
+            warnings.append(EVENTS_INVALID.format(",".join(projects), ",".join(rooms)))
+            await message.respond("\n".join(warnings))
+            return
+
+        routes = [
+            (project, room, events, options) for project in projects for room in rooms
+        ]
+        stored = await self._apply_routes(routes, warnings)
+        if stored:
+            projects = list(dict.fromkeys(route[0] for route in stored))
+            warnings.append(
+                "Done. Relaying messages from {0} to {1} for events: {2}".format(
+                    ",".join(projects), ",".join(rooms), ",".join(events)
+                )
+            )
+        await message.respond("\n".join(warnings))
 
-        await self.opsdroid.memory.put(ROUTES, routes)
+    @match_regex(
+        r"(?s)!atlassian import\s+(?P<routes>.+)", matching_condition="fullmatch"
+    )
+    async def atlassian_import(self, message):
+        """Create many routes at once.
 
-        await message.respond(
-            "Done. Relaying messages from {0} to {1} for "
-            "events: {2}".format(project, room, ",".join(events))
+        Takes either one route per line, written like the arguments of the
+        route command, or a YAML/JSON mapping of projects to rooms to events,
+        such as the output of the export command.
+        """
+        text = message.entities["routes"]["value"]
+        warnings = []
+        try:
+            routes = self._parse_import(text, warnings)
+        except ValueError as exc:
+            await message.respond(f"Could not import routes: {exc}")
+            return
+
+        warnings.extend(
+            EVENTS_INVALID.format(project, room)
+            for project, room, events, _ in routes
+            if events is None
+        )
+        routes = [route for route in routes if route[2] is not None]
+        routes = await self._apply_routes(routes, warnings)
+        warnings.append(
+            "Imported {0} route(s) for {1} project(s).".format(
+                len(routes), len({route[0] for route in routes})
+            )
         )
+        await message.respond("\n".join(warnings))
+
+    @match_regex(r"!atlassian export", matching_condition="fullmatch")
+    async def atlassian_export(self, message):
+        """Dump all routes and their options in the format import takes."""
+        export = {}
+        for instance in self._all_instances():
+            for project, shard in (await instance.route_store.load()).items():
+                export[instance.label(project)] = {
+                    room: (
+                        dict(shard["options"][room], events=events)
+                        if shard["options"].get(room)
+                        else events
+                    )
+                    for room, events in shard["rooms"].items()
+                }
+        await message.respond(json.dumps(export, indent=2, sort_keys=True))
+
+    def _route_events(self, events, warnings):
+        """Validate a list or comma separated string of event patterns.
+
+        Patterns matching no known event are dropped with a warning, no
+        patterns at all means the defaults. Returns None if every pattern
+        was dropped, so no route is created.
+        """
+        if isinstance(events, str):
+            events = events.split(",")
+        if not events:
+            return list(self._default.routing.defaults or ATLASSIAN_EVENTS)
+        unknown = unknown_patterns(events, KNOWN_EVENTS)
+        warnings.extend(EVENT_UNKNOWN.format(event) for event in unknown)
+        return [event for event in events if event not in unknown] or None
+
+    def _route_options(self, text, warnings):
+        options, invalid = self._parse_options(text)
+        warnings.extend(OPTION_INVALID.format(option) for option in invalid)
+        return options
+
+    def _parse_import(self, text, warnings):
+        """Parse the routes of an import into (project, room, events, options)."""
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError:
+            data = None
+        if not isinstance(data, dict):
+            routes = []
+            for line in filter(None, map(str.strip, text.splitlines())):
+                match = ROUTE_LINE.fullmatch(line)
+                if match is None:
+                    raise ValueError(f"cannot parse {line!r}")
+                events = self._route_events(match.group("events"), warnings)
+                options = self._route_options(match.group("options"), warnings)
+                routes.extend(
+                    (project, room, events, options)
+                    for project in match.group("project").split(",")
+                    for room in match.group("room").split(",")
+                )
+            return routes
+
+        routes = []
+        for project, rooms in data.items():
+            if not isinstance(rooms, dict):
+                raise ValueError(f"routes of {project} are not a mapping")
+            for room, events in rooms.items():
+                options = {}
+                if isinstance(events, dict):
+                    events = dict(events)
+                    option_text = " ".join(
+                        f"{name}={value}"
+                        for name, value in events.items()
+                        if name != "events"
+                    )
+                    options = self._route_options(option_text, warnings)
+                    events = events.get("events")
+                if not _event_names(events):
+                    warnings.append(EVENTS_MALFORMED.format(project, room))
+                    continue
+                events = self._route_events(events, warnings)
+                routes.append((str(project), str(room), events, options))
+        return routes
+
+    async def _apply_routes(self, routes, warnings):
+        """Store (project, room, events, options) routes, one write per project.
+
+        Returns the routes that were stored, those of unknown instances are
+        skipped with a warning.
+        """
+        stored = []
+        by_instance = {}
+        for route in routes:
+            project, room, events, options = route
+            instance, key = self._split_project(project)
+            if instance is None:
+                warnings.append(INSTANCE_UNKNOWN.format(project))
+                continue
+            stored.append(route)
+            by_project = by_instance.setdefault(instance, {})
+            by_project.setdefault(key, []).append((room, events, options))
+
+        for instance, by_project in by_instance.items():
+
+            def add_routes(project, shard):
+                for room, events, options in by_project[project]:
+                    shard["rooms"][room] = events
+                    shard["options"].pop(room, None)
+                    if options:
+                        shard["options"][room] = options
+                return True
+
+            store = instance.route_store
+            shards, _ = await store.update_many(by_project, add_routes)
+            for project, shard in shards.items():
+                log.debug(f"project_routes configured {shard['rooms']}")
+                instance.routing.set_shard(project, shard)
+        return stored
 
     @match_regex(
         r"!atlassian routes(?:\s+(?P<project>\S+))?", matching_condition="fullmatch",
     )
     async def atlassian_routes(self, message):
         """Displays the routes for one, multiple or all projects."""
-        routes = await self.opsdroid.memory.get(ROUTES)
-        routes = {} if routes is None else routes
-
         project = message.entities.get("project", {}).get("value")
         if project:
-            if routes.get(project):
-                await message.respond(json.dumps(routes.get(project)))
+            instance, key = self._split_project(project)
+            if instance is None:
+                await message.respond(INSTANCE_UNKNOWN.format(project))
+                return
+            shard = await instance.route_store.get(key)
+            self._refresh_project(instance, key, shard)
+            if shard["rooms"]:
+                await message.respond(json.dumps(shard["rooms"]))
             else:
                 await message.respond(PROJECT_UNKNOWN.format(project))
         else:
+            routes = {}
+            for instance in self._all_instances():
+                for key, shard in (await instance.route_store.load()).items():
+                    routes[instance.label(key)] = shard["rooms"]
             await message.respond(json.dumps(routes))
 
     @match_regex(
@@ -243,23 +780,38 @@ class Atlassian(Skill):
         matching_condition="fullmatch",
     )
     async def atlassian_remove(self, message):
-        routes = await self.opsdroid.memory.get(ROUTES)
-        routes = {} if routes is None else routes
-
         project = message.entities["project"]["value"]
         room = message.entities.get("room", {}).get("value")
+        instance, key = self._split_project(project)
+        if instance is None:
+            await message.respond(INSTANCE_UNKNOWN.format(project))
+            return
+
+        def remove_route(shard):
+            if not room:
+                removed = bool(shard["rooms"])
+                shard["rooms"].clear()
+                return removed
+            return shard["rooms"].pop(room, None) is not None
+
+        shard, removed = await instance.route_store.update(key, remove_route)
+        instance.routing.set_shard(key, shard)
+        if not removed:
+            return
         if not room:
-            if project in routes:
-                del routes[project]
-                await message.respond(f"Removed all configuration for {project}.")
+            await message.respond(f"Removed all configuration for {project}.")
         else:
-            if project in routes and room in routes[project]:
-                del routes[project][room]
-                await message.respond(f"Removed route for {project} to {room}.")
-                if not routes[project]:
-                    del routes[project]
+            await message.respond(f"Removed route for {project} to {room}.")
 
-        await self.opsdroid.memory.put(ROUTES, routes)
+    @match_regex(r"!atlassian formatters", matching_condition="fullmatch")
+    async def atlassian_formatters(self, message):
+        """List which events have dedicated formatters."""
+        dedicated, generic = self.formatter_coverage()
+        await message.respond(
+            "Dedicated formatters: {0}.\nGeneric formatter: {1}.".format(
+                " ".join(dedicated), " ".join(generic)
+            )
+        )
 
     @match_regex(
         r"!atlassian global(?:\s+(?P<room>\S+))?", matching_condition="fullmatch"
@@ -269,121 +821,46 @@ class Atlassian(Skill):
         room = message.entities.get("room", {}).get("value")
         if not room:
             await self.opsdroid.memory.delete(GLOBAL_ROUTE)
+            for instance in self._all_instances():
+                instance.routing.set_global(None)
             await message.respond("Removed global route.")
         else:
             await self.opsdroid.memory.put(GLOBAL_ROUTE, room)
+            for instance in self._all_instances():
+                instance.routing.set_global(room)
             await message.respond(f"Set global route to {room}.")
 
-    # def _handle_jira_auth(self, user):
-    #     oauth = JiraOauth()
-    #     link, state = oauth.request_token()
-    #     self["oauth_request_{}".format(user)] = state
-
-    #     return link
-
-    # def _jira_req_auth(self, frm):
-    #     link = self._handle_jira_auth(frm)
-    #     text = "To use the errbot JIRA integration please give permission at: {}".format(
-    #         link
-    #     )
-    #     self.send(self.build_identifier(frm), text)
-    #     raise JiraNeedsAuthorization()
-
-    # def _jira_client(self, message):
-    #     frm = getattr(message.frm, "real_jid", message.frm.person)
-    #     request_key = "oauth_request_{}".format(frm)
-    #     access_key = "oauth_access_{}".format(frm)
-    #     self.log.warn("FROM: %s", frm)
-    #     if self.get(request_key):
-    #         oauth = JiraOauth()
-    #         state = self[request_key]
-    #         try:
-    #             self[access_key] = oauth.accepted(state)
-    #         except KeyError:
-    #             self._jira_req_auth(frm)
-    #         del self[request_key]
-    #     if not self.get(access_key):
-    #         self._jira_req_auth(frm)
-    #     token, secret = self[access_key]
-    #     oauth_config = {
-    #         "access_token": token,
-    #         "access_token_secret": secret,
-    #         "consumer_key": self.config["JIRA_OAUTH_KEY"],
-    #         "key_cert": self.config["JIRA_OAUTH_PEM"],
-    #     }
-
-    #     return JIRA(self.config["JIRA_BASE_URL"], oauth=oauth_config)
-
-    # @botcmd
-    # def jira_auth(self, message, args):
-    #     """Sends you the link to grant an OAuth token in JIRA"""
-    #     if not message.is_direct:
-    #         return "This has to be used in a direct message."
-    #     return self._handle_jira_auth(message.frm.person)
-
-    # @botcmd
-    # def jira_forget(self, message, args):
-    #     """Deletes your JIRA OAuth token"""
-    #     if not message.is_direct:
-    #         return "This has to be used in a direct message."
-    #     if self.get("oauth_access_{}".format(message.frm.person)):
-    #         del self["oauth_access_{}".format(message.frm.person)]
-    #     if self.get("oauth_request_{}".format(message.frm.person)):
-    #         del self["oauth_request_{}".format(message.frm.person)]
-    #     return "Your OAuth token has been deleted."
-
-    # @re_botcmd(pattern=r"\b[A-Z]+-[0-9]+\b", prefixed=False, matchall=True)
-    # def jira_issue(self, message, matches):
-    #     """Prints JIRA issue information if it recognizes an issue key"""
-    #     if type(message.frm).__name__ == "SlackRoomBot":
-    #         return
-    #     try:
-    #         client = self._jira_client(message)
-    #         for match in matches:
-    #             try:
-    #                 issue = client.issue(match.group())
-    #                 epic_link_name = None
-    #                 if issue.fields.customfield_10680:
-    #                     epic_link = client.issue(
-    #                         issue.fields.customfield_10680
-    #                     )  # FIXME
-    #                     epic_link_name = epic_link.fields.customfield_10681
-    #                 issue_card = {
-    #                     "to": getattr(message.frm, "room", message.frm),
-    #                     "summary": issue.fields.description,
-    #                     "title": "{} - {}".format(issue.key, issue.fields.summary),
-    #                     "link": "{}/browse/{}".format(
-    #                         self.config["JIRA_BASE_URL"], issue.key
-    #                     ),
-    #                     "fields": [
-    #                         (k, v)
-    #                         for k, v in list(
-    #                             {
-    #                                 "Assignee": getattr(
-    #                                     issue.fields.assignee, "displayName", None
-    #                                 ),
-    #                                 "Due Date": issue.fields.duedate,
-    #                                 "Reporter": getattr(
-    #                                     issue.fields.reporter, "displayName", None
-    #                                 ),
-    #                                 "Created": issue.fields.created,
-    #                                 "Priority": issue.fields.priority.name,
-    #                                 "Status": issue.fields.status.name,
-    #                                 "Resolution": getattr(
-    #                                     issue.fields.resolution, "name", None
-    #                                 ),
-    #                                 "Epic Link": epic_link_name,
-    #                             }.items()
-    #                         )
-    #                         if v
-    #                     ],
-    #                 }
-    #                 self.send_card(**issue_card)
-    #             except JIRAError as err:
-    #                 if err.status_code == 404:
-    #                     yield "No Issue {} found".format(match.group())
-    #     except JiraNeedsAuthorization:
-    #         pass
+    @match_regex(ISSUE_KEY.pattern, matching_condition="search")
+    async def jira_issue(self, message):
+        """Prints JIRA issue information if it recognizes an issue key
+
+        Issues in the mirror of an instance are answered from there, Jira
+        is only asked for the others.
+        """
+        keys = list(dict.fromkeys(ISSUE_KEY.findall(message.text)))
+        cards = {}
+        for instance in self._all_instances():
+            if instance.mirror is not None:
+                cards.update(instance.mirror.cards(k for k in keys if k not in cards))
+        services = [i.issues for i in self._all_instances() if i.issues is not None]
+        if not services and not cards:
+            return
+        answered = bool(services)
+        for issues in services:
+            missing = [key for key in keys if cards.get(key) is None]
+            if not missing:
+                break
+            try:
+                cards.update(await issues.cards(missing))
+            except (JiraLookupError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                log.warning(f"Looking up {', '.join(missing)} failed: {exc!r}")
+                if len(services) == 1:
+                    answered = False
+        for key in keys:
+            if cards.get(key) is not None:
+                await message.respond(render_card(cards[key]))
+            elif answered:
+                await message.respond("No Issue {} found".format(key))
 
     @match_webhook("atlassian")
     async def receive(self, request: Request):
@@ -396,69 +873,268 @@ class Atlassian(Skill):
         function exists, use a generic message function.
 
         Once we have a message, route it to the appropriate channels.
+
+        With ``queue_events`` enabled only the validation and the route
+        lookup happen here, the event is then queued for the workers and
+        acknowledged right away.
+
+        With several instances configured, the instance an event belongs to
+        is told by the host of the URLs in its payload.
         """
+        instance = None if self._instances else self._default
+        return await self._receive(request, instance)
+
+    async def receive_instance(self, request: Request):
+        """Handle a payload posted to the webhook path of a named instance.
+
+        The path is not registered through opsdroid's webhook matcher, so
+        the ``webhook-token`` of its web server is checked here the same way.
+        """
+        if not self._webhook_token_valid(request):
+            log.warning(f"Unauthorized webhook request from {request.remote}.")
+            return Response(status=403)
+        instance = self._instances.get(request.match_info["instance"])
+        if instance is None:
+            return Response(status=404)
+        return await self._receive(request, instance)
+
+    async def _receive(self, request, instance):
+        metrics = self._metrics
+        if self._sources is not None and not self._sources.take(request.remote):
+            log.warning(f"Throttled webhook requests from {request.remote}.")
+            metrics.event_dropped("unknown", None, "throttled")
+            return Response(status=429)
+
+        try:
+            with metrics.stage("read"):
+                raw = await read_body(request, self.max_body_size)
+        except PayloadTooLarge as exc:
+            log.warning(f"Rejected a payload of {exc} bytes.")
+            metrics.event_dropped("unknown", None, "too_large")
+            return Response(status=413)
+
+        # Check the secrets on the raw body, before it is trusted in any way.
+        # Events posted to the shared webhook may be signed with the secret
+        # of any instance, which then tells the instance they belong to.
+        verified = instance is not None
+        if instance is not None:
+            if not instance.verifier.verify(request, raw):
+                return self._unauthorized(request)
+        else:
+            for candidate in self._all_instances():
+                if candidate.verifier and candidate.verifier.verify(request, raw):
+                    instance = candidate
+                    verified = True
+                    break
+            else:
+                if all(candidate.verifier for candidate in self._all_instances()):
+                    return self._unauthorized(request)
+
+        # Retries of a webhook carry the identifier of the original delivery,
+        # which allows dropping them before any parsing at all. An identity
+        # is forgotten again if its event is not accepted, so the retry of
+        # an event that was rejected is not taken for a duplicate.
+        identifier = request.headers.get(IDENTIFIER_HEADER)
+        claimed = None
+        if identifier and self._dedup is not None:
+            claimed = "id:" + identifier
+            if await self._dedup.seen(claimed):
+                return self._duplicate("unknown", None, identifier)
+
+        if not self._default.routing.loaded:
+            await self._load_routing()
+
+        try:
+            with metrics.stage("parse"):
+                body = json.loads(raw)
+        except ValueError:
+            metrics.event_dropped("unknown", None, "invalid")
+            return Response(status=400)
+        event_type = body.get("webhookEvent") if isinstance(body, dict) else None
+        if not isinstance(event_type, str):
+            metrics.event_dropped("unknown", None, "invalid")
+            return Response(status=400)
+        metrics.event_received(event_type)
+
+        if instance is None:
+            instance = self._detect_instance(body)
+        if not verified and instance.verifier:
+            if claimed is not None:
+                await self._dedup.forget(claimed)
+            return self._unauthorized(request)
+        project = event_project(body)
+        label = instance.label(project)
+        if event_type in MIRRORED_EVENTS:
+            self._issue_changed(instance, event_type, body["issue"])
+
+        with metrics.stage("route"):
+            rooms = instance.routing.targets(project, event_type)
+        if not rooms:
+            return self._unrouted(event_type, label)
+
+        if not identifier and self._dedup is not None:
+            identity = event_identity(body)
+            if await self._dedup.seen(identity):
+                return self._duplicate(event_type, label, identity)
+            claimed = identity
+
+        if self._queue is not None:
+            item = (body, project, event_type, rooms, instance)
+            if not await self._queue.put(item):
+                log.warning(f"Event queue is full, rejected {event_type}.")
+                if claimed is not None:
+                    await self._dedup.forget(claimed)
+                metrics.event_dropped(event_type, label, "rejected")
+                return Response(status=503)
+            return Response(status=202)
+
+        await self._process(body, project, event_type, rooms, instance)
+        return Response(status=204)
 
-        body = await request.json()
-        event_type = body["webhookEvent"]
+    @staticmethod
+    def _invalidate_issue(instance, key):
+        if instance.issues is not None:
+            instance.issues.invalidate(key)
+
+    @classmethod
+    def _issue_changed(cls, instance, event_type, issue):
+        if event_type in ISSUE_CHANGED_EVENTS:
+            cls._invalidate_issue(instance, issue["key"])
+        if instance.mirror is not None:
+            if event_type == "jira:issue_deleted":
+                instance.mirror.discard(issue["key"])
+            else:
+                instance.mirror.update(issue)
+
+    def _unauthorized(self, request):
+        log.warning(f"Rejected an unverified webhook request from {request.remote}.")
+        self._metrics.event_dropped("unknown", None, "unauthorized")
+        return Response(status=401)
+
+    def _unrouted(self, event_type, project):
+        # Not a project we know or nobody subscribed to this event, so
+        # accept the payload, return 204 but discard the message
+        log.info(
+            f"Event {event_type} received for {project} but no such project "
+            "is configured."
+        )
+        self._metrics.event_dropped(event_type, project, "unrouted")
+        return Response(status=204)
 
-        project = body["issue"]["fields"]["project"]["key"] if "issue" in body else None
-        global_event = event_type in GLOBAL_EVENTS
+    def _duplicate(self, event_type, project, identity):
+        log.info(f"Skipped {event_type} for {project}, {identity} was already seen.")
+        self._metrics.event_dropped(event_type, project, "duplicate")
+        return Response(status=204)
 
-        routes = await self.opsdroid.memory.get(ROUTES)
-        routes = {} if routes is None else routes
-        if not routes.get(project) and not global_event:
-            # Not a project we know so accept the payload, return 200 but
-            # discard the message
-            log.info(
-                f"Event {event_type} received for {project} but no such project "
-                "is configured."
-            )
-            return Response(status=204)
+    async def _process(self, body, project, event_type, rooms, instance=None):
+        """Render an accepted event and deliver it to ``rooms``.
 
-        message = self.dispatch_event(body, project, event_type)
+        Issue updates carrying a changelog are merged into a digest instead
+        for every room whose route has a debounce window.
+        """
+        instance = instance or self._default
+        label = instance.label(project)
+        if event_type == "jira:issue_updated" and "changelog" in body:
+            immediate = []
+            for room in rooms:
+                window = instance.routing.options(project, room).get("debounce")
+                if window:
+                    self._coalescer.add(room, body, window, label)
+                else:
+                    immediate.append(room)
+            rooms = immediate
+            if not rooms:
+                return
+
+        with self._metrics.stage("dispatch"):
+            message = self.dispatch_event(body, project, event_type, instance=instance)
 
         # - if we have a message and is it not empty or None
-        # - get all rooms for the project we received the event for
-        # - check if we should deliver this event
-        # - join the room (this won't do anything if we're already joined)
-        # - send the message
+        # - send the message to every room the routing table resolved,
+        #   including the global route for global events, concurrently
         if message:
-            for room_name in routes.get(project, {}):
-                events = routes[project][room_name]
-                if event_type in events or "*" in events:
-                    await self.opsdroid.send(Message(message, target=room_name))
-            global_route = await self.opsdroid.memory.get(GLOBAL_ROUTE)
-            if global_event and global_route:
-                await self.opsdroid.send(Message(message, target=global_route))
+            await self._send(message, rooms, event_type, label)
 
-        return Response(status=204)
+    async def _send(self, message, rooms, event_type, project):
+        with self._metrics.stage("send"):
+            succeeded, failed = await self._delivery.send(message, rooms, event_type)
+        self._metrics.event_delivered(event_type, project, succeeded, failed)
 
-    def dispatch_event(self, body, project, event_type, generic_fn=None):
-        """
-        Dispatch the message. Check explicitly with hasattr first. When
-        using a try/catch with AttributeError errors in the
-        message_function which result in an AttributeError would cause
-        us to call msg_generic, which is not what we want.
-        """
-        if generic_fn is None:
-            generic_fn = self.msg_generic
+    async def _send_digest(self, room, message, project):
+        await self._send(message, (room,), "jira:issue_updated", project)
 
-        message_function = "msg_{0}".format(event_type.replace(":", "_"))
-        if hasattr(self, message_function):
-            message = getattr(self, message_function)(body, project)
-        else:
-            message = generic_fn(body, project, event_type)
-        return message
+    @classmethod
+    def dispatch_table(cls):
+        """Return the event name to formatter mapping of this class.
 
-    @staticmethod
-    def msg_generic(body, project, event_type):
-        return f"{event_type} on {project}: {body}"
+        It is compiled once from the ``msg_*`` methods and the registered
+        formatters, every entry is called as ``fn(skill, body, project,
+        event_type)``.
+        """
+        table = _DISPATCH_TABLES.get(cls)
+        if table is None:
+            table = {
+                _event_name(name): _method_formatter(cls, name)
+                for name in dir(cls)
+                if name.startswith("msg_") and name != "msg_generic"
+            }
+            for event_type, fn in FORMATTERS.items():
+                table[event_type] = _external_formatter(fn)
+            _DISPATCH_TABLES[cls] = table
+        return table
+
+    @classmethod
+    def formatter_coverage(cls):
+        """Split the known events into (dedicated, generic) formatters."""
+        table = cls.dispatch_table()
+        dedicated = [event for event in ATLASSIAN_EVENTS if event in table]
+        generic = [event for event in ATLASSIAN_EVENTS if event not in table]
+        return dedicated, generic
+
+    def dispatch_event(self, body, project, event_type, generic_fn=None, instance=None):
+        """
+        Dispatch the message to the formatter compiled for this event type
+        or, if there is none or it returns NotImplemented, to ``generic_fn``
+        which defaults to msg_generic for the ``instance`` the event came
+        from.
+        """
+        formatter = self.dispatch_table().get(event_type)
+        if formatter is not None:
+            message = formatter(self, body, project, event_type)
+            if message is not NotImplemented:
+                return message
+
+        if generic_fn is not None:
+            return generic_fn(body, project, event_type)
+        return self.msg_generic(body, project, event_type, instance)
+
+    def msg_generic(self, body, project, event_type, instance=None):
+        """Render the well-known fields of any payload.
+
+        Only the user, the key, the title and the URL are picked from the
+        payload, the whole thing is never converted to a string, and the
+        result is capped at the ``generic_max_length`` of ``instance``, the
+        default one if None.
+        """
+        length = (instance or self._default).generic_max_length
+        parts = []
+        for name, paths in GENERIC_FIELDS:
+            value = lookup(body, paths)
+            if value is None and name == "url":
+                issue_url = lookup(body, (("issue", "self"),))
+                key = lookup(body, (("issue", "key"),))
+                if issue_url and key:
+                    value = templates.browse_url(issue_url, key)
+            if value is not None:
+                parts.append(f"{name}: {_truncate(value, length)}")
+        if not parts and isinstance(body, dict):
+            parts.append("fields: " + ", ".join(sorted(body)[:10]))
+        return _truncate(f"{event_type} on {project}: " + ", ".join(parts), length)
 
     @staticmethod
     def msg_issue_generic(body, project, event_type=None):
         summary = body["issue"]["fields"]["summary"]
-        url_parts = urlparse(body["issue"]["self"])
-        base_url = "{}://{}".format(url_parts.scheme, url_parts.hostname)
+        base_url = templates.base_url(body["issue"]["self"])
         user = body["user"]["displayName"]
         key = body["issue"]["key"]
         if "changelog" in body:
@@ -470,23 +1146,29 @@ class Atlassian(Skill):
                 from_, to = item["fromString"], item["toString"]
                 changes.append(f"{field}: {from_} → {to}")
 
-            return f"""[JIRA] {user} edited issue <a href="{url}">{key}</a>
-                       <br>
-                       <b>{summary}</b>
-                       <br>""" + "<br>".join(
-                changes
-            ) + (f"<pre>{comment}</pre>" if comment != "" else "")
+            return templates.render(
+                "issue_edited",
+                user=user,
+                url=url,
+                key=key,
+                summary=summary,
+                changes="<br>".join(changes),
+                comment=f"<pre>{comment}</pre>" if comment != "" else "",
+            )
 
         if "comment" in body:
             commentId = body["comment"]["id"]
             url = f"{base_url}/browse/{key}?focusedCommentId={commentId}&page=com.atlassian.jira.plugin.system.issuetabpanels:comment-tabpanel#comment-{commentId}"
             action = "created" if event_type == "issue_commented" else "edited"
 
-            return (
-                f"""[JIRA] {user} {action} a comment on <a href="{url}">{key}</a>
-                    <br>
-                    <b>{summary}</b>
-                    <br>""" "<pre>" + body["comment"]["body"] + "</pre>"
+            return templates.render(
+                "issue_commented",
+                user=user,
+                action=action,
+                url=url,
+                key=key,
+                summary=summary,
+                comment=body["comment"]["body"],
             )
 
     def msg_jira_issue_updated(self, body, project):
@@ -496,47 +1178,66 @@ class Atlassian(Skill):
 
     @staticmethod
     def msg_jira_issue_created(body, project):
-        url_parts = urlparse(body["issue"]["self"])
-        base_url = "{}://{}".format(url_parts.scheme, url_parts.hostname)
         key = body["issue"]["key"]
-        url = "{}/browse/{}".format(base_url, key)
-        user = body["user"]["displayName"]
-        summary = body["issue"]["fields"]["summary"]
-        description = body["issue"]["fields"]["description"]
 
-        return f"""[JIRA] {user} created issue <a href="{url}">{key}</a>
-                   <br>
-                   <b>{summary}<b>
-                   <pre>{description}</pre>"""
+        return templates.render(
+            "issue_created",
+            user=body["user"]["displayName"],
+            url=templates.browse_url(body["issue"]["self"], key),
+            key=key,
+            summary=body["issue"]["fields"]["summary"],
+            description=body["issue"]["fields"]["description"],
+        )
 
     @staticmethod
     def msg_jira_issue_deleted(body, project):
-        user = body["user"]["displayName"]
-        key = body["issue"]["key"]
-        summary = body["issue"]["fields"]["summary"]
-
-        return f"""[JIRA] {user} deleted issue {key}
-                   <br>
-                   <b>{summary}<b>"""
+        return templates.render(
+            "issue_deleted",
+            user=body["user"]["displayName"],
+            key=body["issue"]["key"],
+            summary=body["issue"]["fields"]["summary"],
+        )
 
     @staticmethod
     def msg_issue_comment_deleted(body, project):
-        url_parts = urlparse(body["issue"]["self"])
-        base_url = "{}://{}".format(url_parts.scheme, url_parts.hostname)
-        user = body["user"]["displayName"]
         key = body["issue"]["key"]
-        url = "{}/browse/{}".format(base_url, key)
 
-        return f'[JIRA] {user} deleted a comment on <a href="{url}">{key}</a>'
+        return templates.render(
+            "comment_deleted",
+            user=body["user"]["displayName"],
+            url=templates.browse_url(body["issue"]["self"], key),
+            key=key,
+        )
 
     @staticmethod
     def msg_user_deleted(body, project):
-        user = body["user"]["name"]
-
-        return f"[JIRA] User {user} was deleted"
+        return templates.render("user_deleted", user=body["user"]["name"])
 
     @staticmethod
     def msg_user_created(body, project):
-        user = body["user"]["name"]
-
-        return f"[JIRA] User {user} was created"
+        return templates.render("user_created", user=body["user"]["name"])
+
+    # Confluence events, see confluence.formatter.
+    msg_page_created = confluence.formatter("page", "created")
+    msg_blueprint_page_created = confluence.formatter("page", "created")
+    msg_page_updated = confluence.formatter("page", "updated")
+    msg_page_moved = confluence.formatter("page", "moved")
+    msg_page_trashed = confluence.formatter("page", "trashed")
+    msg_page_restored = confluence.formatter("page", "restored")
+    msg_page_removed = confluence.formatter("page", "removed")
+    msg_blog_created = confluence.formatter("blog", "created")
+    msg_blog_updated = confluence.formatter("blog", "updated")
+    msg_blog_trashed = confluence.formatter("blog", "trashed")
+    msg_blog_restored = confluence.formatter("blog", "restored")
+    msg_blog_removed = confluence.formatter("blog", "removed")
+    msg_comment_created = confluence.formatter("comment", "created")
+    msg_comment_updated = confluence.formatter("comment", "updated")
+    msg_comment_removed = confluence.formatter("comment", "removed")
+    msg_attachment_created = confluence.formatter("attachment", "created")
+    msg_attachment_updated = confluence.formatter("attachment", "updated")
+    msg_attachment_trashed = confluence.formatter("attachment", "trashed")
+    msg_attachment_restored = confluence.formatter("attachment", "restored")
+    msg_attachment_removed = confluence.formatter("attachment", "removed")
+    msg_space_created = confluence.formatter("space", "created")
+    msg_space_updated = confluence.formatter("space", "updated")
+    msg_space_removed = confluence.formatter("space", "removed")
@@ -0,0 +1,202 @@
+"""Replay benchmark for Atlassian.receive and the msg_* formatters.
+
+Works offline: the skill is driven through an aiohttp test client with a
+stubbed opsdroid memory and connector, replaying the payloads from
+payloads.py to 1, 10 and 100 routed rooms. Memory is reported as the median
+tracemalloc peak of handling one event, its footprint, not the number of
+allocations it makes, which CPython has no cheap way to count. Run from the
+repository root:
+
+    python benchmarks/bench_receive.py [--events N] [--rooms 1,10,100]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from payloads import PROJECT, corpus  # noqa: E402
+
+
+def load_skill():
+    """Import the repository as the ``atlassian`` skill package."""
+    spec = importlib.util.spec_from_file_location(
+        "atlassian",
+        os.path.join(ROOT, "__init__.py"),
+        submodule_search_locations=[ROOT],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["atlassian"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class Memory:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def put(self, key, value):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class OpsDroid:
+    """Just enough of opsdroid for the skill, with a connector that only counts."""
+
+    web_server = None
+
+    def __init__(self):
+        self.memory = Memory()
+        self.sent = 0
+
+    async def send(self, event):
+        self.sent += 1
+
+
+async def make_skill(module, rooms, config=None):
+    opsdroid = OpsDroid()
+    await opsdroid.memory.put(module.GLOBAL_ROUTE, "global")
+    skill = module.Atlassian(opsdroid, dict(config or {}, name="atlassian"))
+
+    def add_rooms(shard):
+        shard["rooms"].update((f"room{n}", ["*"]) for n in range(rooms))
+        return True
+
+    await skill._default.route_store.update(PROJECT, add_rooms)
+    await skill._load_routing()
+    return opsdroid, skill
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def replay(module, rooms, events):
+    """Post every payload ``events`` times, return stats by payload name."""
+    opsdroid, skill = await make_skill(module, rooms)
+    app = web.Application()
+    app.router.add_post("/skill/atlassian/atlassian", skill.receive)
+    payloads = {name: json.dumps(body).encode() for name, body in corpus().items()}
+
+    results = {}
+    async with TestClient(TestServer(app)) as client:
+        for name, data in payloads.items():
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(events):
+                start = time.perf_counter()
+                async with client.post("/skill/atlassian/atlassian", data=data) as resp:
+                    assert resp.status < 300, (name, resp.status)
+                latencies.append(time.perf_counter() - start)
+            elapsed = time.perf_counter() - started
+
+            samples = min(events, 20)
+            tracemalloc.start()
+            peaks = []
+            for _ in range(samples):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                async with client.post("/skill/atlassian/atlassian", data=data) as resp:
+                    await resp.read()
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+
+            results[name] = {
+                "size": len(data),
+                "rate": events / elapsed,
+                "p50": percentile(latencies, 50),
+                "p99": percentile(latencies, 99),
+                "peak": statistics.median(peaks),
+            }
+    return results
+
+
+def time_formatters(module):
+    """Time dispatch_event and every msg_* formatter on its own."""
+    _, skill = asyncio.run(make_skill(module, 1))
+    payloads = corpus()
+    by_event = {}
+    for body in payloads.values():
+        by_event.setdefault(body["webhookEvent"], body)
+        if "issue_event_type_name" in body:
+            by_event.setdefault(body["issue_event_type_name"], body)
+    by_event["generic"] = payloads["large_generic"]
+    by_event["issue_generic"] = payloads["jira:issue_updated"]
+
+    timings = {}
+    for name, body in payloads.items():
+        event_type = body["webhookEvent"]
+        timings[f"dispatch_event[{name}]"] = _time(
+            lambda: skill.dispatch_event(body, PROJECT, event_type)
+        )
+
+    table = skill.dispatch_table()
+    for method in sorted(name for name in dir(skill) if name.startswith("msg_")):
+        event_type = module._event_name(method)
+        body = by_event.get(event_type)
+        if body is None:
+            timings[method] = None
+        elif method == "msg_generic":
+            timings[method] = _time(
+                lambda: skill.msg_generic(body, PROJECT, body["webhookEvent"])
+            )
+        else:
+            formatter = table[event_type]
+            timings[method] = _time(lambda: formatter(skill, body, PROJECT, event_type))
+    return timings
+
+
+def _time(fn):
+    number, total = timeit.Timer(fn).autorange()
+    return total / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rooms", default="1,10,100")
+    args = parser.parse_args()
+
+    module = load_skill()
+    for rooms in (int(rooms) for rooms in args.rooms.split(",")):
+        print(f"\nreceive, {rooms} routed room(s), {args.events} events per payload")
+        print(
+            f"{'payload':<24}{'bytes':>9}{'events/s':>11}"
+            f"{'p50 ms':>9}{'p99 ms':>9}{'peak KiB/event':>16}"
+        )
+        for name, stats in asyncio.run(replay(module, rooms, args.events)).items():
+            print(
+                f"{name:<24}{stats['size']:>9}{stats['rate']:>11.1f}"
+                f"{stats['p50'] * 1000:>9.3f}{stats['p99'] * 1000:>9.3f}"
+                f"{stats['peak'] / 1024:>16.1f}"
+            )
+
+    print("\nformatters")
+    for name, seconds in time_formatters(module).items():
+        if seconds is None:
+            print(f"{name:<48}{'no payload':>12}")
+        else:
+            print(f"{name:<48}{seconds * 1e6:>9.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Micro-benchmark of the RSA-SHA1 OAuth signer.
+
+Compares parsing the PEM for every signature, as the signer used to, with
+the cached key it keeps now. Run from the repository root with any RSA
+private key, e.g. one made by ``openssl genrsa -traditional 2048``:
+
+    python benchmarks/bench_signing.py key.pem [seconds]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import oauth2 as oauth  # noqa: E402
+from tlslite.utils import keyfactory  # noqa: E402
+
+from jira_oauth import SignatureMethod_RSA_SHA1  # noqa: E402
+
+
+class ParsePerSignature(SignatureMethod_RSA_SHA1):
+    """The signer as it was, parsing the key on every call."""
+
+    @property
+    def privatekey(self):
+        return keyfactory.parsePrivateKey(self.pem)
+
+
+def rate(signer, consumer, token, seconds):
+    request = oauth.Request.from_consumer_and_token(
+        consumer,
+        token=token,
+        http_method="GET",
+        http_url="https://jira.example.com/rest/api/2/search",
+        parameters={"jql": 'key in ("ABC-1")'},
+    )
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        signer.sign(request, consumer, token)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(path, seconds=2.0):
+    with open(path) as fp:
+        pem = fp.read()
+    consumer = oauth.Consumer("bench", "dont_care")
+    token = oauth.Token("token", "secret")
+
+    before = rate(ParsePerSignature(pem), consumer, token, seconds)
+    after = rate(SignatureMethod_RSA_SHA1(pem), consumer, token, seconds)
+    print(f"parse per signature: {before:10.1f} signatures/s")
+    print(f"cached key:          {after:10.1f} signatures/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1], *(float(arg) for arg in sys.argv[2:3]))
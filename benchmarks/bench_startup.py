@@ -0,0 +1,132 @@
+"""Startup benchmark: how long loading the skill takes and how much memory.
+
+Every run happens in a fresh interpreter. The parts of opsdroid any worker
+has loaded anyway are imported first and not counted, then the skill is
+imported and instantiated with a webhook-only configuration. Exits with
+status 1 if the median exceeds a budget or if a dependency only needed for
+OAuth, REST or optional features was imported. Run from the repository
+root:
+
+    python benchmarks/bench_startup.py [--runs 5] [--max-ms 100] [--max-mib 10]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Modules a webhook-only skill must not have imported.
+LAZY = ("tlslite", "oauth2", "jira", "jinja2", "redis")
+
+
+class Memory:
+    async def get(self, key):
+        return None
+
+    async def put(self, key, value):
+        pass
+
+    async def delete(self, key):
+        pass
+
+
+class OpsDroid:
+    web_server = None
+
+    def __init__(self):
+        self.memory = Memory()
+
+
+def max_rss():
+    """Peak resident memory of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure():
+    """Load the skill in this interpreter and return what it cost."""
+    import opsdroid.configuration  # noqa: F401
+    import opsdroid.events  # noqa: F401
+    import opsdroid.matchers  # noqa: F401
+    import opsdroid.skill  # noqa: F401
+    import opsdroid.web  # noqa: F401
+
+    loaded = set(sys.modules)
+    rss = max_rss()
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(
+        "atlassian",
+        os.path.join(ROOT, "__init__.py"),
+        submodule_search_locations=[ROOT],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["atlassian"] = module
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    module.Atlassian(OpsDroid(), {"name": "atlassian"})
+    ready = time.perf_counter()
+    return {
+        "import": imported - start,
+        "init": ready - imported,
+        "rss": max_rss() - rss,
+        "lazy": sorted(
+            name for name in LAZY if name in sys.modules and name not in loaded
+        ),
+    }
+
+
+def run_child():
+    return json.loads(
+        subprocess.run(
+            [sys.executable, __file__, "--child"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=100.0)
+    parser.add_argument("--max-mib", type=float, default=10.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    runs = [run_child() for _ in range(args.runs)]
+    imports = statistics.median(run["import"] for run in runs) * 1000
+    inits = statistics.median(run["init"] for run in runs) * 1000
+    rss = statistics.median(run["rss"] for run in runs) / 2**20
+    lazy = sorted({name for run in runs for name in run["lazy"]})
+    print(f"import     {imports:9.1f} ms")
+    print(f"init       {inits:9.1f} ms")
+    print(f"total      {imports + inits:9.1f} ms (budget {args.max_ms:.0f} ms)")
+    print(f"rss growth {rss:9.1f} MiB (budget {args.max_mib:.0f} MiB)")
+
+    failures = []
+    if imports + inits > args.max_ms:
+        failures.append("startup takes longer than its budget")
+    if rss > args.max_mib:
+        failures.append("startup needs more memory than its budget")
+    if lazy:
+        failures.append(f"imported at startup: {', '.join(lazy)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""A corpus of Jira and Confluence webhook payloads for the benchmarks.
+
+The payloads follow the shape of what Jira Server/Cloud and Confluence
+send, including the noise a real payload carries such as avatar URLs,
+rendered fields and custom fields.
+"""
+
+import copy
+
+BASE_URL = "https://jira.example.com"
+PROJECT = "ABC"
+
+
+def _user(name="jdoe", display_name="Jane Doe"):
+    return {
+        "self": f"{BASE_URL}/rest/api/2/user?username={name}",
+        "name": name,
+        "key": name,
+        "emailAddress": f"{name}@example.com",
+        "avatarUrls": {
+            size: f"{BASE_URL}/secure/useravatar?size={size}&ownerId={name}"
+            for size in ("48x48", "24x24", "16x16", "32x32")
+        },
+        "displayName": display_name,
+        "active": True,
+        "timeZone": "Europe/Berlin",
+    }
+
+
+def _issue(key=f"{PROJECT}-1", custom_fields=20, description_size=400):
+    fields = {
+        "summary": "Checkout fails for customers with a saved card",
+        "description": ("Steps to reproduce the problem. " * description_size)[
+            : description_size * 8
+        ],
+        "issuetype": {"id": "1", "name": "Bug", "subtask": False},
+        "project": {
+            "self": f"{BASE_URL}/rest/api/2/project/10000",
+            "id": "10000",
+            "key": PROJECT,
+            "name": "Alpha Beta Commerce",
+            "projectTypeKey": "software",
+            "avatarUrls": {"48x48": f"{BASE_URL}/secure/projectavatar?pid=10000"},
+        },
+        "priority": {"id": "2", "name": "High"},
+        "status": {"id": "3", "name": "In Progress"},
+        "assignee": _user(),
+        "reporter": _user("rroe", "Richard Roe"),
+        "creator": _user("rroe", "Richard Roe"),
+        "labels": ["checkout", "payments"],
+        "components": [{"id": "10100", "name": "Web Shop"}],
+        "created": "2020-05-04T10:11:12.000+0200",
+        "updated": "2020-05-04T12:13:14.000+0200",
+        "duedate": None,
+        "resolution": None,
+        "watches": {"watchCount": 3, "isWatching": False},
+    }
+    for number in range(custom_fields):
+        fields[f"customfield_{10600 + number}"] = {
+            "value": f"option {number}",
+            "id": str(20000 + number),
+        }
+    return {
+        "id": "10001",
+        "self": f"{BASE_URL}/rest/api/2/issue/10001",
+        "key": key,
+        "fields": fields,
+    }
+
+
+def issue_created():
+    return {
+        "timestamp": 1588586472000,
+        "webhookEvent": "jira:issue_created",
+        "issue_event_type_name": "issue_created",
+        "user": _user(),
+        "issue": _issue(),
+    }
+
+
+def issue_updated():
+    return {
+        "timestamp": 1588586473000,
+        "webhookEvent": "jira:issue_updated",
+        "issue_event_type_name": "issue_generic",
+        "user": _user(),
+        "issue": _issue(),
+        "changelog": {
+            "id": "10400",
+            "items": [
+                {
+                    "field": "status",
+                    "fieldtype": "jira",
+                    "from": "1",
+                    "fromString": "Open",
+                    "to": "3",
+                    "toString": "In Progress",
+                },
+                {
+                    "field": "assignee",
+                    "fieldtype": "jira",
+                    "from": None,
+                    "fromString": None,
+                    "to": "jdoe",
+                    "toString": "Jane Doe",
+                },
+            ],
+        },
+        "comment": {
+            "id": "10500",
+            "self": f"{BASE_URL}/rest/api/2/issue/10001/comment/10500",
+            "author": _user(),
+            "body": "Picking this up, looks like a stale token in the card vault.",
+            "updateAuthor": _user(),
+            "created": "2020-05-04T12:13:14.000+0200",
+            "updated": "2020-05-04T12:13:14.000+0200",
+        },
+    }
+
+
+def issue_comment_deleted():
+    return {
+        "timestamp": 1588586474000,
+        "webhookEvent": "jira:issue_updated",
+        "issue_event_type_name": "issue_comment_deleted",
+        "user": _user(),
+        "issue": _issue(),
+    }
+
+
+def issue_deleted():
+    return {
+        "timestamp": 1588586474500,
+        "webhookEvent": "jira:issue_deleted",
+        "issue_event_type_name": "issue_deleted",
+        "user": _user(),
+        "issue": _issue(),
+    }
+
+
+def user_created():
+    return {
+        "timestamp": 1588586475000,
+        "webhookEvent": "user_created",
+        "user": _user("nnew", "Nora New"),
+    }
+
+
+def user_deleted():
+    return {
+        "timestamp": 1588586476000,
+        "webhookEvent": "user_deleted",
+        "user": _user("oold", "Otto Old"),
+    }
+
+
+def page_updated():
+    """A Confluence page update, these carry no issue but a page and space."""
+    return {
+        "timestamp": 1588586477000,
+        "webhookEvent": "page_updated",
+        "userAccountId": "5b10a2844c20165700ede21g",
+        "updateTrigger": "edit_page",
+        "page": {
+            "id": 123456,
+            "title": "Release checklist",
+            "creatorAccountId": "5b10a2844c20165700ede21g",
+            "lastModifierAccountId": "5b10a2844c20165700ede21g",
+            "spaceKey": "ENG",
+            "creationDate": 1588586400000,
+            "modificationDate": 1588586477000,
+            "version": 7,
+            "self": "https://example.atlassian.net/wiki/spaces/ENG/pages/123456",
+            "tinyUrl": "https://example.atlassian.net/wiki/x/QAE",
+        },
+    }
+
+
+def large_generic():
+    """A worklog event carrying a big issue, which has no dedicated formatter."""
+    body = issue_created()
+    body["webhookEvent"] = "worklog_created"
+    body["issue"] = _issue(custom_fields=400, description_size=20000)
+    body["worklog"] = {
+        "id": "10600",
+        "timeSpent": "3h",
+        "comment": "Pairing session. " * 1000,
+        "author": _user(),
+    }
+    return body
+
+
+CORPUS = {
+    "jira:issue_created": issue_created,
+    "jira:issue_updated": issue_updated,
+    "issue_comment_deleted": issue_comment_deleted,
+    "jira:issue_deleted": issue_deleted,
+    "user_created": user_created,
+    "user_deleted": user_deleted,
+    "page_updated": page_updated,
+    "large_generic": large_generic,
+}
+
+
+def corpus():
+    """Return a fresh copy of every payload, by name."""
+    return {name: copy.deepcopy(factory()) for name, factory in CORPUS.items()}
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TTLCache:
+    """A bounded mapping whose entries expire ``ttl`` seconds after insertion.
+
+    Once ``maxsize`` entries are stored the least recently used one is
+    evicted to make room for a new one.
+    """
+
+    def __init__(self, maxsize=1000, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires < self._clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import aiohttp
+
+DEFAULT_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 10
+DEFAULT_KEEPALIVE = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+
+class HttpClient:
+    """The one HTTP session the skill makes all outgoing requests through.
+
+    The aiohttp session is created on first use, so it is bound to the
+    running event loop, and pools keep-alive connections with a total and a
+    per host limit. ``close`` has to be awaited when the skill is unloaded.
+    """
+
+    def __init__(
+        self,
+        limit=DEFAULT_LIMIT,
+        limit_per_host=DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout=DEFAULT_KEEPALIVE,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+from . import templates
+from .templates import browse_url
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+DEFAULT_MAX_PENDING = 500
+
+
+class Digest:
+    """The changes collected for one issue and room during a window."""
+
+    def __init__(self, body, project):
+        issue = body["issue"]
+        self.key = issue["key"]
+        self.url = browse_url(issue["self"], self.key)
+        self.summary = issue["fields"]["summary"]
+        self.project = project
+        self.users = []
+        self.changes = OrderedDict()
+        self.comments = []
+        self.handle = None
+
+    def add(self, body):
+        self.summary = body["issue"]["fields"]["summary"]
+        user = body["user"]["displayName"]
+        if user not in self.users:
+            self.users.append(user)
+        for item in body["changelog"]["items"]:
+            field = item["field"][0].upper() + item["field"][1:]
+            if field in self.changes:
+                self.changes[field][1] = item["toString"]
+            else:
+                self.changes[field] = [item["fromString"], item["toString"]]
+        comment = body.get("comment", {}).get("body", "")
+        if comment != "":
+            self.comments.append(comment)
+
+    def render(self):
+        changes = [
+            f"{field}: {from_} → {to}"
+            for field, (from_, to) in self.changes.items()
+            if from_ != to
+        ]
+        return templates.render(
+            "issue_digest",
+            users=", ".join(self.users),
+            url=self.url,
+            key=self.key,
+            summary=self.summary,
+            changes="<br>".join(changes),
+            comments="".join(f"<pre>{comment}</pre>" for comment in self.comments),
+        )
+
+
+class Coalescer:
+    """Merge bursts of issue updates into one digest per issue and room.
+
+    The first update for an issue opens a window of ``window`` seconds for
+    that room, every further update within it is merged into the same
+    digest which is handed to ``flush(room, text, project)`` once the window
+    closes. At most ``max_pending`` digests are held, the oldest one is
+    flushed early when that limit is hit.
+    """
+
+    def __init__(self, flush, max_pending=DEFAULT_MAX_PENDING):
+        self._flush = flush
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        self._tasks = set()
+
+    def add(self, room, body, window, project):
+        """Merge a ``jira:issue_updated`` payload into the digest for room.
+
+        ``project`` is what the digest is reported as once it is flushed.
+        """
+        # Keyed by the REST URL so equal keys of different sites stay apart.
+        key = (body["issue"]["self"], room)
+        digest = self._pending.get(key)
+        if digest is None:
+            while len(self._pending) >= self.max_pending:
+                log.debug("Too many pending digests, flushing the oldest early.")
+                self._expire(next(iter(self._pending)))
+            digest = self._pending[key] = Digest(body, project)
+            digest.handle = asyncio.get_running_loop().call_later(
+                window, self._expire, key
+            )
+        digest.add(body)
+
+    async def flush_all(self):
+        """Send every pending digest now, e.g. on shutdown."""
+        for key in list(self._pending):
+            self._expire(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _expire(self, key):
+        digest = self._pending.pop(key, None)
+        if digest is None:
+            return
+        digest.handle.cancel()
+        task = asyncio.ensure_future(
+            self._flush(key[1], digest.render(), digest.project)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
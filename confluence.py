@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from . import templates
+from .payload import lookup
+
+# How the objects Confluence events are about are called in messages.
+LABELS = {
+    "page": "page",
+    "blog": "blog post",
+    "attachment": "attachment",
+}
+
+
+def _user(body, kind):
+    return lookup(
+        body,
+        (
+            ("user",),
+            ("user", "displayName"),
+            (kind, "lastModifierName"),
+            (kind, "creatorName"),
+            ("userAccountId",),
+            (kind, "lastModifierAccountId"),
+            (kind, "creatorAccountId"),
+        ),
+    )
+
+
+def formatter(kind, action):
+    """Return the formatter of the Confluence event ``<kind>_<action>``.
+
+    Only the fields shown are looked up: the user, title, space key, tiny
+    link and version. Payloads without the expected object, such as Jira's
+    own comment events, are left to the generic formatter by returning
+    NotImplemented.
+    """
+
+    def msg(skill, body, project):
+        if "issue" in body or not isinstance(body.get(kind), dict):
+            return NotImplemented
+
+        fields = {
+            "user": _user(body, kind) or "Someone",
+            "action": action,
+            "space": project or lookup(body, (("space", "key"),)) or "?",
+        }
+        if kind == "space":
+            fields["title"] = lookup(body, (("space", "name"),)) or fields["space"]
+            fields["url"] = lookup(body, (("space", "self"),)) or ""
+            return templates.render("confluence_space", **fields)
+        if kind == "comment":
+            fields["title"] = lookup(body, (("comment", "parent", "title"),)) or "?"
+            fields["url"] = (
+                lookup(
+                    body,
+                    (
+                        ("comment", "self"),
+                        ("comment", "parent", "tinyUrl"),
+                        ("comment", "parent", "self"),
+                    ),
+                )
+                or ""
+            )
+            return templates.render("confluence_comment", **fields)
+
+        version = lookup(body, ((kind, "version", "number"), (kind, "version")))
+        fields["kind"] = LABELS[kind]
+        fields["title"] = lookup(body, ((kind, "title"), (kind, "fileName"))) or "?"
+        fields["url"] = (
+            lookup(body, ((kind, "tinyUrl"), (kind, "tinyLink"), (kind, "self"))) or ""
+        )
+        fields["version"] = f" (v{version})" if version else ""
+        return templates.render("confluence_content", **fields)
+
+    return msg
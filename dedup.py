@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from .cache import TTLCache
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+# Jira Cloud sends the same identifier with every retry of a webhook.
+IDENTIFIER_HEADER = "X-Atlassian-Webhook-Identifier"
+
+# Where the parts identifying an event are found in a payload.
+IDENTITY_PATHS = (
+    ("webhookEvent",),
+    ("timestamp",),
+    ("issue_event_type_name",),
+    ("issue", "key"),
+    ("changelog", "id"),
+    ("comment", "id"),
+    ("worklog", "id"),
+    ("page", "id"),
+    ("blog", "id"),
+    ("attachment", "id"),
+    ("space", "key"),
+    ("user", "name"),
+)
+
+
+def event_identity(body):
+    """Derive what identifies an event from its payload."""
+    parts = []
+    for path in IDENTITY_PATHS:
+        value = body
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        parts.append("" if value is None else str(value))
+    return "|".join(parts)
+
+
+class RedisClaims:
+    """Claims on event identities shared by all replicas through Redis.
+
+    SET NX with an expiry makes claiming atomic, so of several replicas
+    receiving the same event exactly one gets to deliver it.
+    """
+
+    def __init__(self, url, prefix="atlassian:seen:"):
+        from redis import asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def claim(self, identity, ttl):
+        return bool(
+            await self._client.set(self.prefix + identity, 1, nx=True, ex=int(ttl))
+        )
+
+    async def release(self, identity):
+        await self._client.delete(self.prefix + identity)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class Deduplicator:
+    """Remember the events that were processed during the last ``ttl`` seconds.
+
+    Identities are kept in a bounded in-memory LRU first, which answers for
+    repeated deliveries to this process. If a ``shared`` store is given,
+    events not seen locally are claimed there too, so replicas behind a load
+    balancer do not deliver the same event twice.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600.0, shared=None):
+        self.ttl = ttl
+        self._seen = TTLCache(maxsize, ttl)
+        self._shared = shared
+
+    async def seen(self, identity):
+        """Return whether ``identity`` was seen before, recording it if not."""
+        if identity in self._seen:
+            return True
+        self._seen.put(identity, True)
+        if self._shared is None:
+            return False
+        try:
+            return not await self._shared.claim(identity, self.ttl)
+        except Exception as exc:
+            log.warning(f"Could not claim event {identity}: {exc!r}")
+            return False
+
+    async def forget(self, identity):
+        """Forget ``identity`` again, e.g. when its event was not accepted."""
+        self._seen.pop(identity)
+        if self._shared is None:
+            return
+        try:
+            await self._shared.release(identity)
+        except Exception as exc:
+            log.warning(f"Could not release event {identity}: {exc!r}")
+
+    async def close(self):
+        if self._shared is not None:
+            await self._shared.close()
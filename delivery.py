@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+from opsdroid.events import Message
+
+from .ratelimit import TokenBucket
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_BATCH = 10
+RETRY_BATCH = 100
+
+
+class RoomState:
+    """Token bucket and backlog of a rate limited room."""
+
+    def __init__(self, limits):
+        rate, burst, batch = limits
+        self.limits = limits
+        self.bucket = TokenBucket(rate, burst)
+        self.batch = max(batch, 1)
+        self.pending = []
+        self.flusher = None
+
+
+class Delivery:
+    """Send a rendered message to many rooms at once.
+
+    At most ``concurrency`` sends are in flight at any time and each send is
+    bounded by ``timeout`` seconds. A failing or hanging room never cancels
+    or delays delivery to the others.
+
+    ``limits(room)`` may return a (rate, burst, batch) tuple to put a token
+    bucket in front of a room. Messages exceeding its budget are queued
+    and sent as multi-line messages of up to ``batch`` of them each, once
+    the bucket has a token again.
+
+    With a ``spool`` messages that could not be delivered are stored and
+    retried in the background once ``start`` was called. As soon as a room
+    accepts messages again its backlog is sent in batches.
+    """
+
+    def __init__(
+        self,
+        opsdroid,
+        concurrency=DEFAULT_CONCURRENCY,
+        timeout=DEFAULT_TIMEOUT,
+        limits=None,
+        spool=None,
+    ):
+        self.opsdroid = opsdroid
+        self.timeout = timeout
+        self.limits = limits
+        self.spool = spool
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rooms = {}
+        self._retrier = None
+
+    def start(self):
+        """Start retrying spooled messages."""
+        if self.spool is not None and self._retrier is None:
+            self._retrier = asyncio.ensure_future(self._retry())
+
+    async def close(self):
+        if self._retrier is not None:
+            self._retrier.cancel()
+            await asyncio.gather(self._retrier, return_exceptions=True)
+            self._retrier = None
+        if self.spool is not None:
+            self.spool.close()
+
+    async def send(self, text, rooms, event_type=None):
+        """Deliver ``text`` to every room, returning (succeeded, failed).
+
+        Messages queued behind a room's rate limit count as succeeded.
+        """
+        rooms = list(rooms)
+        results = await asyncio.gather(
+            *(self._send_limited(text, room) for room in rooms),
+            return_exceptions=True,
+        )
+
+        failed = 0
+        for room, result in zip(rooms, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                log.warning(f"Delivering {event_type} to {room} failed: {result!r}")
+                await self._spool(text, room)
+
+        succeeded = len(rooms) - failed
+        log.info(f"Delivered {event_type} to {succeeded} room(s), {failed} failed.")
+        return succeeded, failed
+
+    async def flush_all(self):
+        """Send everything held back by rate limits right away."""
+        for room, state in list(self._rooms.items()):
+            flusher = state.flusher
+            if flusher is not None:
+                # A cancelled flusher puts back the batch it was sending.
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
+            while state.pending:
+                batch = state.pending[: state.batch]
+                del state.pending[: state.batch]
+                try:
+                    await self._send_one("\n".join(batch), room)
+                except Exception as exc:
+                    log.warning(
+                        f"Flushing {len(batch)} message(s) to {room} failed: {exc!r}"
+                    )
+                    await self._spool("\n".join(batch), room)
+
+    async def _send_limited(self, text, room):
+        limits = self.limits(room) if self.limits is not None else None
+        if limits is None:
+            return await self._send_one(text, room)
+
+        state = self._room_state(room, limits)
+        if not state.pending and state.bucket.take():
+            return await self._send_one(text, room)
+
+        state.pending.append(text)
+        if state.flusher is None:
+            state.flusher = asyncio.ensure_future(self._flush(room, state))
+
+    def _room_state(self, room, limits):
+        state = self._rooms.get(room)
+        if state is None or state.limits != limits:
+            previous, state = state, RoomState(limits)
+            self._rooms[room] = state
+            if previous is not None:
+                # The cancelled flusher puts its batch back into the shared
+                # backlog before the new one, scheduled after it, looks at it.
+                flushing = previous.flusher is not None
+                if flushing:
+                    previous.flusher.cancel()
+                state.pending = previous.pending
+                if flushing or state.pending:
+                    state.flusher = asyncio.ensure_future(self._flush(room, state))
+        return state
+
+    async def _flush(self, room, state):
+        try:
+            while state.pending:
+                await asyncio.sleep(state.bucket.delay())
+                if not state.bucket.take():
+                    continue
+                batch = state.pending[: state.batch]
+                del state.pending[: state.batch]
+                try:
+                    await self._send_one("\n".join(batch), room)
+                except asyncio.CancelledError:
+                    state.pending[:0] = batch
+                    raise
+                except Exception as exc:
+                    log.warning(
+                        f"Delivering {len(batch)} batched message(s) to {room} "
+                        f"failed: {exc!r}"
+                    )
+                    await self._spool("\n".join(batch), room)
+        finally:
+            state.flusher = None
+
+    async def _send_one(self, text, room):
+        async with self._semaphore:
+            await asyncio.wait_for(
+                self.opsdroid.send(Message(text, target=room)), self.timeout
+            )
+
+    async def _spool(self, text, room):
+        if self.spool is None:
+            return
+        try:
+            await self.spool.put(room, text)
+        except Exception as exc:
+            log.error(f"Could not spool a message to {room}, it is lost: {exc!r}")
+
+    async def _retry(self):
+        while True:
+            try:
+                rows = await self.spool.due(RETRY_BATCH)
+                delivered = await self._resend(rows) if rows else 0
+            except Exception as exc:
+                log.error(f"Retrying spooled messages failed: {exc!r}")
+                delivered = 0
+            if not delivered:
+                await asyncio.sleep(self.spool.retry)
+
+    async def _resend(self, rows):
+        """Retry spooled rows in batches per room, returning how many went out."""
+        by_room = {}
+        for row in rows:
+            by_room.setdefault(row[1], []).append(row)
+        results = await asyncio.gather(
+            *(self._resend_room(room, rows) for room, rows in by_room.items())
+        )
+        delivered = sum(results)
+        if delivered:
+            log.info(f"Delivered {delivered} spooled message(s).")
+        return delivered
+
+    async def _resend_room(self, room, rows):
+        """Resend spooled rows to a room, through its token bucket if limited."""
+        limits = self.limits(room) if self.limits is not None else None
+        state = self._room_state(room, limits) if limits is not None else None
+        size = state.batch if state is not None else DEFAULT_BATCH
+        for start in range(0, len(rows), size):
+            batch = rows[start : start + size]
+            while state is not None and not state.bucket.take():
+                await asyncio.sleep(state.bucket.delay())
+            try:
+                await self._send_one("\n".join(row[2] for row in batch), room)
+            except Exception as exc:
+                log.debug(f"Room {room} still unavailable: {exc!r}")
+                await self.spool.failed(rows[start:])
+                return start
+            await self.spool.done([row[0] for row in batch])
+        return len(rows)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import fnmatch
+
+WILDCARD = "*"
+EXCLUDE = "!"
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(pattern):
+    return not GLOB_CHARS.isdisjoint(pattern)
+
+
+def expand(pattern, known):
+    """Return the events of ``known`` matching a pattern without its ``!``."""
+    if is_glob(pattern):
+        return frozenset(fnmatch.filter(known, pattern))
+    return frozenset((pattern,))
+
+
+def unknown_patterns(patterns, known):
+    """Return the patterns that match none of the ``known`` events."""
+    unknown = []
+    for pattern in patterns:
+        name = pattern[1:] if pattern.startswith(EXCLUDE) else pattern
+        if name == WILDCARD:
+            continue
+        if is_glob(name) and expand(name, known):
+            continue
+        if name not in known:
+            unknown.append(pattern)
+    return unknown
+
+
+class EventFilter:
+    """The events a route subscribes to, resolved once when it is saved.
+
+    ``patterns`` are event names, globs such as ``jira:*`` or ``page_*``,
+    and exclusions of either prefixed with ``!``. Only giving exclusions
+    means every event but those, giving no patterns at all means none.
+    Patterns are resolved against the ``known`` events into a frozenset, so
+    matching a known event is a set lookup. Events outside ``known`` only match ``*`` or exclusion-only
+    filters, unless an exclusion covers them.
+    """
+
+    __slots__ = ("patterns", "events", "everything", "excludes", "_known")
+
+    def __init__(self, patterns, known):
+        self.patterns = tuple(patterns)
+        self._known = known
+        includes = [p for p in self.patterns if not p.startswith(EXCLUDE)]
+        self.excludes = tuple(p[1:] for p in self.patterns if p.startswith(EXCLUDE))
+        self.everything = WILDCARD in includes or (not includes and bool(self.excludes))
+
+        events = set(known) if self.everything else set()
+        for pattern in includes:
+            if pattern != WILDCARD:
+                events.update(expand(pattern, known))
+        for pattern in self.excludes:
+            events.difference_update(expand(pattern, events))
+        self.events = frozenset(events)
+
+    def __contains__(self, event):
+        if event in self.events:
+            return True
+        if not self.everything or event in self._known:
+            return False
+        return not any(fnmatch.fnmatchcase(event, p) for p in self.excludes)
+
+    def __repr__(self):
+        return f"EventFilter({list(self.patterns)!r})"
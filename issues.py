@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from .cache import MISSING, TTLCache
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+EPIC_LINK_FIELD = "customfield_10680"
+EPIC_NAME_FIELD = "customfield_10681"
+
+CARD_FIELDS = [
+    "summary",
+    "description",
+    "assignee",
+    "duedate",
+    "reporter",
+    "created",
+    "priority",
+    "status",
+    "resolution",
+]
+
+
+class JiraLookupError(Exception):
+    pass
+
+
+class IssueService:
+    """Look up issue cards through the Jira REST API, with a TTL+LRU cache.
+
+    All keys that are not cached are fetched with a single search and the
+    epics they link to with at most one more, instead of one request per
+    issue and epic. Keys Jira does not know are cached as None as well.
+    """
+
+    def __init__(
+        self,
+        http,
+        base_url,
+        auth=None,
+        epic_link_field=EPIC_LINK_FIELD,
+        epic_name_field=EPIC_NAME_FIELD,
+        maxsize=1000,
+        ttl=300.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.epic_link_field = epic_link_field
+        self.epic_name_field = epic_name_field
+        self._http = http
+        self._auth = auth
+        self._issues = TTLCache(maxsize, ttl)
+        self._epics = TTLCache(maxsize, ttl)
+
+    def invalidate(self, key):
+        """Forget what is cached for an issue, e.g. after it was updated."""
+        self._issues.pop(key)
+        self._epics.pop(key)
+
+    async def cards(self, keys):
+        """Return a mapping of every key to its card or None if unknown."""
+        result = {}
+        missing = []
+        for key in keys:
+            card = self._issues.get(key, MISSING)
+            if card is MISSING:
+                missing.append(key)
+            else:
+                result[key] = card
+
+        if missing:
+            fields = CARD_FIELDS + [self.epic_link_field]
+            for issue in await self._search(missing, fields):
+                card = self._card(issue)
+                self._issues.put(card["key"], card)
+                result[card["key"]] = card
+            for key in missing:
+                if key not in result:
+                    self._issues.put(key, None)
+                    result[key] = None
+
+        epics = {card["epic"] for card in result.values() if card and card["epic"]}
+        epics = [epic for epic in epics if epic not in self._epics]
+        if epics:
+            for epic in await self._search(epics, [self.epic_name_field]):
+                self._epics.put(epic["key"], epic["fields"].get(self.epic_name_field))
+
+        return {
+            key: (
+                card
+                if card is None
+                else dict(card, epic_name=self._epics.get(card["epic"]))
+            )
+            for key, card in result.items()
+            if key in keys
+        }
+
+    async def _search(self, keys, fields):
+        params = {
+            "jql": "key in ({0})".format(",".join(f'"{key}"' for key in keys)),
+            "fields": ",".join(fields),
+            "maxResults": str(len(keys)),
+            "validateQuery": "warn",
+        }
+        async with self._http.session.get(
+            f"{self.base_url}/rest/api/2/search", params=params, auth=self._auth
+        ) as response:
+            if response.status != 200:
+                raise JiraLookupError(
+                    "Invalid response {0}: {1}".format(
+                        response.status, await response.text()
+                    )
+                )
+            return (await response.json()).get("issues", [])
+
+    def _card(self, issue):
+        fields = issue["fields"]
+        return {
+            "key": issue["key"],
+            "title": "{} - {}".format(issue["key"], fields.get("summary")),
+            "summary": fields.get("description"),
+            "link": "{}/browse/{}".format(self.base_url, issue["key"]),
+            "epic": fields.get(self.epic_link_field),
+            "fields": [
+                (k, v)
+                for k, v in {
+                    "Assignee": (fields.get("assignee") or {}).get("displayName"),
+                    "Due Date": fields.get("duedate"),
+                    "Reporter": (fields.get("reporter") or {}).get("displayName"),
+                    "Created": fields.get("created"),
+                    "Priority": (fields.get("priority") or {}).get("name"),
+                    "Status": (fields.get("status") or {}).get("name"),
+                    "Resolution": (fields.get("resolution") or {}).get("name"),
+                }.items()
+                if v
+            ],
+        }
+
+
+def render_card(card):
+    """Render a card returned by IssueService.cards as a chat message."""
+    fields = list(card["fields"])
+    if card.get("epic_name"):
+        fields.append(("Epic Link", card["epic_name"]))
+    return (
+        f'<a href="{card["link"]}">{card["title"]}</a><br>'
+        + "<br>".join(f"<b>{name}</b>: {value}" for name, value in fields)
+        + (f'<pre>{card["summary"]}</pre>' if card["summary"] else "")
+    )
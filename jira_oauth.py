@@ -1,14 +1,32 @@
-# import config
+import asyncio
 import base64
 from urllib.parse import parse_qsl
-from tlslite.utils import keyfactory
-import oauth2 as oauth
 
+# tlslite and oauth2 are only imported once OAuth is used, so processes
+# that just relay webhooks do not pay for loading them.
+
+
+class SignatureMethod_RSA_SHA1:
+    """Signs requests for oauth2 with an RSA key, as Jira expects."""
 
-class SignatureMethod_RSA_SHA1(oauth.SignatureMethod):
     name = "RSA-SHA1"
 
+    def __init__(self, pem):
+        self.pem = pem
+        self._privatekey = None
+
+    @property
+    def privatekey(self):
+        """The private key, parsed from the PEM on first use only."""
+        if self._privatekey is None:
+            from tlslite.utils import keyfactory
+
+            self._privatekey = keyfactory.parsePrivateKey(self.pem)
+        return self._privatekey
+
     def signing_base(self, request, consumer, token):
+        import oauth2 as oauth
+
         if not hasattr(request, "normalized_url") or request.normalized_url is None:
             raise ValueError("Base URL for request is not set.")
 
@@ -28,18 +46,29 @@ class SignatureMethod_RSA_SHA1(oauth.SignatureMethod):
         """Builds the base signature string."""
         key, raw = self.signing_base(request, consumer, token)
 
-        privatekey = keyfactory.parsePrivateKey(config.JIRA_OAUTH_PEM)
-        signature = privatekey.hashAndSign(raw.encode("utf-8"))
+        signature = self.privatekey.hashAndSign(raw.encode("utf-8"))
 
         return base64.b64encode(signature)
 
+    def check(self, request, consumer, token, signature):
+        return self.sign(request, consumer, token) == signature
+
 
 class JiraOauth:
-    def __init__(self):
-        consumer_key = config.JIRA_OAUTH_KEY
+    """The OAuth 1.0a dance with Jira.
+
+    Requests are signed with oauth2 in the default executor, as the RSA
+    work would block the event loop, and sent through the skill's shared
+    HttpClient so they do not open a new connection every time.
+    """
+
+    def __init__(self, config, http):
+        import oauth2 as oauth
+
+        consumer_key = config["JIRA_OAUTH_KEY"]
         consumer_secret = "dont_care"
 
-        base_url = config.JIRA_BASE_URL
+        base_url = config["JIRA_BASE_URL"]
         self.request_token_url = "{}/plugins/servlet/oauth/request-token".format(
             base_url
         )
@@ -47,32 +76,56 @@ class JiraOauth:
         self.authorize_url = "{}/plugins/servlet/oauth/authorize".format(base_url)
 
         self.consumer = oauth.Consumer(consumer_key, consumer_secret)
+        self.signature_method = SignatureMethod_RSA_SHA1(config["JIRA_OAUTH_PEM"])
+        self.http = http
+
+    async def authorization(self, method, url, token=None, parameters=None):
+        """Return the headers for an OAuth signed request."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._authorization, method, url, token, parameters
+        )
+
+    def _authorization(self, method, url, token, parameters):
+        import oauth2 as oauth
 
-    def request_token(self):
-        client = oauth.Client(self.consumer)
-        client.set_signature_method(SignatureMethod_RSA_SHA1())
-        resp, content = client.request(self.request_token_url, "POST")
-        if resp["status"] != "200":
-            raise Exception("Invalid response %s: %s" % (resp["status"], content))
+        request = oauth.Request.from_consumer_and_token(
+            self.consumer,
+            token=token,
+            http_method=method,
+            http_url=url,
+            parameters=parameters,
+        )
+        request.sign_request(self.signature_method, self.consumer, token)
+        return request.to_header()
+
+    async def _post(self, url, token=None):
+        headers = await self.authorization("POST", url, token)
+        async with self.http.session.post(url, headers=headers) as resp:
+            return resp.status, await resp.read()
 
-        self.request_token = dict(parse_qsl(content))
+    async def request_token(self):
+        status, content = await self._post(self.request_token_url)
+        if status != 200:
+            raise Exception("Invalid response %s: %s" % (status, content))
+
+        request_token = dict(parse_qsl(content))
         state = {
-            "token": self.request_token[b"oauth_token"],
-            "token_secret": self.request_token[b"oauth_token_secret"],
+            "token": request_token[b"oauth_token"],
+            "token_secret": request_token[b"oauth_token_secret"],
         }
         return (
             "{}?oauth_token={}".format(
-                self.authorize_url, self.request_token[b"oauth_token"].decode("utf-8")
+                self.authorize_url, request_token[b"oauth_token"].decode("utf-8")
             ),
             state,
         )
 
-    def accepted(self, state):
+    async def accepted(self, state):
+        import oauth2 as oauth
+
         token = oauth.Token(state["token"], state["token_secret"])
-        client = oauth.Client(self.consumer, token)
-        client.set_signature_method(SignatureMethod_RSA_SHA1())
 
-        resp, content = client.request(self.access_token_url, "POST")
+        status, content = await self._post(self.access_token_url, token)
         access_token = dict(parse_qsl(content))
 
         return (
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import time
+from contextlib import nullcontext
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MAX_PROJECTS = 100
+OTHER = "other"
+# Stands in for the event type of payloads it could not be read from.
+UNKNOWN = "unknown"
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = (
+        '{0}="{1}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, *labels, value=1):
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+
+    def observe(self, value, *labels):
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.labels + ("le",)
+        for labels, counts in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield "{0}_bucket{1} {2}".format(
+                    self.name, _labels(names, labels + (bound,)), cumulative
+                )
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {counts[-1]}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+class Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Metrics:
+    """Counters and histograms of the webhook pipeline.
+
+    Events are labelled with their type and project. Only the first
+    ``max_projects`` projects get a label of their own, all others are
+    counted as "other" to keep the number of series bounded. For the same
+    reason event types outside ``events``, if given, are counted as "other".
+    """
+
+    def __init__(self, max_projects=MAX_PROJECTS, events=None):
+        self.max_projects = max_projects
+        self.events = events
+        self._projects = set()
+        self.received = Counter(
+            "atlassian_events_received_total",
+            "Webhook events received.",
+            ("event",),
+        )
+        self.dropped = Counter(
+            "atlassian_events_dropped_total",
+            "Webhook events dropped without being delivered.",
+            ("event", "project", "reason"),
+        )
+        self.delivered = Counter(
+            "atlassian_events_delivered_total",
+            "Messages delivered to rooms.",
+            ("event", "project"),
+        )
+        self.send_errors = Counter(
+            "atlassian_send_errors_total",
+            "Messages that could not be delivered to a room.",
+            ("event", "project"),
+        )
+        self.stages = Histogram(
+            "atlassian_stage_seconds",
+            "Time spent in each stage of the webhook pipeline.",
+            ("stage",),
+        )
+
+    def project(self, project):
+        if project in self._projects:
+            return project
+        if len(self._projects) < self.max_projects:
+            self._projects.add(project)
+            return project
+        return OTHER
+
+    def event(self, event_type):
+        if self.events is None or event_type in self.events:
+            return event_type
+        return UNKNOWN if event_type == UNKNOWN else OTHER
+
+    def stage(self, name):
+        return Timer(self.stages, (name,))
+
+    def event_received(self, event_type):
+        self.received.inc(self.event(event_type))
+
+    def event_dropped(self, event_type, project, reason):
+        self.dropped.inc(self.event(event_type), self.project(project), reason)
+
+    def event_delivered(self, event_type, project, succeeded, failed):
+        event_type = self.event(event_type)
+        project = self.project(project)
+        if succeeded:
+            self.delivered.inc(event_type, project, value=succeeded)
+        if failed:
+            self.send_errors.inc(event_type, project, value=failed)
+
+    def render(self):
+        lines = []
+        for metric in (
+            self.received,
+            self.dropped,
+            self.delivered,
+            self.send_errors,
+            self.stages,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics:
+    """Stands in for Metrics when they are disabled, doing nothing at all."""
+
+    _stage = nullcontext()
+
+    def stage(self, name):
+        return self._stage
+
+    def event_received(self, event_type):
+        pass
+
+    def event_dropped(self, event_type, project, reason):
+        pass
+
+    def event_delivered(self, event_type, project, succeeded, failed):
+        pass
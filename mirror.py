@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+from .issues import EPIC_LINK_FIELD, EPIC_NAME_FIELD
+from .templates import browse_url
+
+DEFAULT_MIRROR_SIZE = 10000
+
+
+def _name(field, attribute="name"):
+    return (field or {}).get(attribute)
+
+
+class MirroredIssue:
+    """The few fields of an issue needed to render its card."""
+
+    __slots__ = (
+        "key",
+        "url",
+        "summary",
+        "status",
+        "assignee",
+        "priority",
+        "epic",
+        "epic_name",
+    )
+
+    def __init__(self, key, url, summary, status, assignee, priority, epic, epic_name):
+        self.key = key
+        self.url = url
+        self.summary = summary
+        self.status = status
+        self.assignee = assignee
+        self.priority = priority
+        self.epic = epic
+        self.epic_name = epic_name
+
+
+class IssueMirror:
+    """Issues as last seen in webhook payloads, for the ``maxsize`` latest.
+
+    Every ``jira:issue_created`` and ``jira:issue_updated`` event replaces
+    the mirrored issue and ``jira:issue_deleted`` drops it, so lookups of
+    issues that are mirrored need no request to Jira. Once ``maxsize``
+    issues are mirrored the least recently used one is evicted. Changes
+    made while no webhooks arrived are not seen until the next event of
+    the issue.
+    """
+
+    def __init__(
+        self,
+        maxsize=DEFAULT_MIRROR_SIZE,
+        epic_link_field=EPIC_LINK_FIELD,
+        epic_name_field=EPIC_NAME_FIELD,
+    ):
+        self.maxsize = maxsize
+        self.epic_link_field = epic_link_field
+        self.epic_name_field = epic_name_field
+        self._issues = OrderedDict()
+
+    def __len__(self):
+        return len(self._issues)
+
+    def update(self, issue):
+        """Mirror the ``issue`` object of a webhook payload."""
+        fields = issue.get("fields") or {}
+        key = issue["key"]
+        self._issues[key] = MirroredIssue(
+            key,
+            browse_url(issue["self"], key),
+            fields.get("summary"),
+            _name(fields.get("status")),
+            _name(fields.get("assignee"), "displayName"),
+            _name(fields.get("priority")),
+            fields.get(self.epic_link_field),
+            fields.get(self.epic_name_field),
+        )
+        self._issues.move_to_end(key)
+        while len(self._issues) > self.maxsize:
+            self._issues.popitem(last=False)
+
+    def discard(self, key):
+        self._issues.pop(key, None)
+
+    def cards(self, keys):
+        """Return the cards of the mirrored ``keys``, leaving out the others.
+
+        The cards have the shape of those of IssueService.cards, without
+        the description and fields the payloads are not mirrored for.
+        """
+        result = {}
+        for key in keys:
+            issue = self._issues.get(key)
+            if issue is None:
+                continue
+            self._issues.move_to_end(key)
+            epic = self._issues.get(issue.epic) if issue.epic else None
+            result[key] = {
+                "key": key,
+                "title": "{} - {}".format(key, issue.summary),
+                "summary": None,
+                "link": issue.url,
+                "epic": issue.epic,
+                "epic_name": epic.epic_name if epic is not None else issue.epic,
+                "fields": [
+                    (name, value)
+                    for name, value in (
+                        ("Assignee", issue.assignee),
+                        ("Priority", issue.priority),
+                        ("Status", issue.status),
+                    )
+                    if value
+                ],
+            }
+        return result
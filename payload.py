@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# The client_max_size aiohttp enforces on request.json() by default.
+DEFAULT_MAX_BODY_SIZE = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Where the project of an event is found, Confluence spaces count as one.
+PROJECT_PATHS = (
+    ("issue", "fields", "project", "key"),
+    ("page", "spaceKey"),
+    ("blog", "spaceKey"),
+    ("comment", "spaceKey"),
+    ("comment", "parent", "spaceKey"),
+    ("attachment", "spaceKey"),
+    ("attachment", "container", "spaceKey"),
+    ("space", "key"),
+)
+# Where the REST URL of what an event is about is found, the host tells
+# which site it came from.
+SELF_PATHS = (
+    ("issue", "self"),
+    ("page", "self"),
+    ("blog", "self"),
+    ("comment", "self"),
+    ("attachment", "self"),
+    ("space", "self"),
+    ("self",),
+)
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+async def read_body(request, max_size=DEFAULT_MAX_BODY_SIZE):
+    """Read the raw request body, refusing anything above ``max_size`` bytes.
+
+    The declared Content-Length is checked before reading anything and the
+    body is read in chunks so an oversized payload is never buffered whole.
+    """
+    if request.content_length is not None and request.content_length > max_size:
+        raise PayloadTooLarge(request.content_length)
+
+    chunks, size = [], 0
+    async for chunk in request.content.iter_chunked(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            raise PayloadTooLarge(size)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def lookup(body, paths):
+    """Return the first non-empty scalar found at one of ``paths``."""
+    for path in paths:
+        value = body
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(value, (str, int, float)) and value != "":
+            return str(value)
+    return None
+
+
+def event_project(body):
+    """Return the Jira project or Confluence space key of an event."""
+    if "issue" in body:
+        return lookup(body, PROJECT_PATHS[:1])
+    return lookup(body, PROJECT_PATHS[1:])
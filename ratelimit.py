@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` operations per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self):
+        """Take a token, returning False if none is available."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def delay(self):
+        """Seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class SourceLimiter:
+    """A TokenBucket per source address, for the ``maxsize`` latest sources.
+
+    The least recently seen source is forgotten when a new one would exceed
+    ``maxsize``, so a flood of addresses cannot grow it without bounds.
+    """
+
+    def __init__(self, rate, burst=1, maxsize=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._clock = clock
+        self._buckets = collections.OrderedDict()
+
+    def take(self, source):
+        """Take a token of ``source``, returning False if it has none left."""
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = TokenBucket(
+                self.rate, self.burst, self._clock
+            )
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(source)
+        return bucket.take()
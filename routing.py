@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+from .filters import EventFilter
+
+EMPTY = frozenset()
+NO_OPTIONS = {}
+
+
+class RoutingTable:
+    """In-memory index of the configured routes.
+
+    Maps (project, event type) to the frozenset of rooms an event has to be
+    delivered to, with the global route already folded in. It is loaded once
+    from memory and then updated in place, one project at a time, by the
+    admin commands so that the webhook path never has to touch the memory
+    backend. The version of each project's shard is kept to tell when it
+    is out of date.
+    """
+
+    def __init__(self, events, global_events):
+        self._events = frozenset(events)
+        self._global_events = frozenset(global_events)
+        self._routes = {}
+        self._options = {}
+        self._room_options = {}
+        self._versions = {}
+        self._global_room = None
+        self._index = {}
+        self._wildcards = {}
+        self._excluding = set()
+        self._global_targets = {}
+        self.defaults = None
+        self.loaded = False
+
+    def load(self, shards, global_route=None, defaults=None):
+        """Replace the whole table with the persisted route shards."""
+        self._routes = {}
+        self._options = {}
+        self._room_options = {}
+        self._versions = {}
+        self._index = {}
+        self._wildcards = {}
+        self._excluding = set()
+        self._global_room = global_route
+        self.defaults = defaults
+        self._compile_global()
+        for project, shard in shards.items():
+            self.set_shard(project, shard)
+        self.loaded = True
+
+    def refresh(self, shards, global_route=None, defaults=None):
+        """Catch up with the persisted shards, recompiling only what changed.
+
+        Projects whose shard version differs are recompiled, projects
+        without a shard any more are removed. Returns how many changed.
+        """
+        changed = 0
+        for project, shard in shards.items():
+            if shard["version"] != self.version(project):
+                self.set_shard(project, shard)
+                changed += 1
+        for project in [p for p in self._routes if p not in shards]:
+            self.set_project(project, None)
+            changed += 1
+        if global_route != self._global_room:
+            self.set_global(global_route)
+        self.defaults = defaults
+        return changed
+
+    def set_shard(self, project, shard):
+        """Recompile a project from its persisted shard."""
+        self.set_project(project, shard["rooms"], shard["options"], shard["version"])
+
+    def set_project(self, project, rooms, options=None, version=None):
+        """Recompile the routes of a single project.
+
+        ``options`` maps rooms to their route options. Passing an empty
+        mapping or None as ``rooms`` removes the project.
+        """
+        self._versions.pop(project, None)
+        if version is not None and rooms:
+            self._versions[project] = version
+        for key in [(project, event) for event in self._project_events(project)]:
+            self._index.pop(key, None)
+        self._wildcards.pop(project, None)
+        self._excluding.discard(project)
+        self._routes.pop(project, None)
+        changed = set(self._options.pop(project, {}))
+        if options and rooms:
+            self._options[project] = {
+                room: dict(room_options)
+                for room, room_options in options.items()
+                if room in rooms and room_options
+            }
+            changed.update(self._options[project])
+        for room in changed:
+            self._merge_room_options(room)
+        if not rooms:
+            return
+
+        self._routes[project] = {
+            room: EventFilter(events, self._events) for room, events in rooms.items()
+        }
+        self._compile_project(project)
+
+    def set_global(self, room):
+        """Set or, when passed None, remove the global route."""
+        self._global_room = room
+        self._compile_global()
+        for project in self._routes:
+            self._compile_project(project)
+
+    def is_known(self, project):
+        return project in self._routes
+
+    def version(self, project):
+        """Return the shard version ``project`` was compiled from, 0 if none."""
+        return self._versions.get(project, 0)
+
+    def options(self, project, room):
+        """Return the options of the route from ``project`` to ``room``."""
+        return self._options.get(project, NO_OPTIONS).get(room, NO_OPTIONS)
+
+    def room_options(self, room):
+        """Return the options of all routes to ``room``, the lowest value wins."""
+        return self._room_options.get(room, NO_OPTIONS)
+
+    def _merge_room_options(self, room):
+        merged = {}
+        for options in self._options.values():
+            for name, value in options.get(room, NO_OPTIONS).items():
+                merged[name] = min(merged.get(name, value), value)
+        if merged:
+            self._room_options[room] = merged
+        else:
+            self._room_options.pop(room, None)
+
+    def targets(self, project, event_type):
+        """Return the rooms an event of ``event_type`` for ``project`` goes to."""
+        rooms = self._index.get((project, event_type))
+        if rooms is not None:
+            return rooms
+        if project in self._excluding:
+            filters = self._routes[project]
+            return frozenset(
+                room for room in self._wildcards[project] if event_type in filters[room]
+            )
+        if project in self._wildcards:
+            return self._wildcards[project]
+        return self._global_targets.get(event_type, EMPTY)
+
+    def _project_events(self, project):
+        events = set(self._events)
+        for event_filter in self._routes.get(project, {}).values():
+            events.update(event_filter.events)
+        return events
+
+    def _compile_global(self):
+        if self._global_room:
+            room = frozenset((self._global_room,))
+            self._global_targets = {event: room for event in self._global_events}
+        else:
+            self._global_targets = {}
+
+    def _compile_project(self, project):
+        rooms = self._routes[project]
+        self._wildcards[project] = frozenset(
+            room for room, event_filter in rooms.items() if event_filter.everything
+        )
+        if any(f.everything and f.excludes for f in rooms.values()):
+            self._excluding.add(project)
+        else:
+            self._excluding.discard(project)
+        for event in self._project_events(project):
+            targets = frozenset(
+                room for room, event_filter in rooms.items() if event in event_filter
+            )
+            self._index[(project, event)] = targets | self._global_targets.get(
+                event, EMPTY
+            )
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+DEFAULT_SPOOL_SIZE = 10000
+DEFAULT_SPOOL_AGE = 86400.0
+DEFAULT_RETRY = 5.0
+DEFAULT_MAX_BACKOFF = 600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    due REAL NOT NULL
+)
+"""
+
+
+class Spool:
+    """Messages that could not be delivered, kept in SQLite until they are.
+
+    Every message is due for a retry after an exponential backoff starting
+    at ``retry`` seconds and capped at ``max_backoff``, with jitter so rooms
+    do not retry in lockstep. At most ``max_size`` messages younger than
+    ``max_age`` seconds are kept, the oldest ones are dropped first. The
+    database is only touched from the default executor, one call at a time.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_size=DEFAULT_SPOOL_SIZE,
+        max_age=DEFAULT_SPOOL_AGE,
+        retry=DEFAULT_RETRY,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        clock=time.time,
+    ):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.retry = retry
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    async def _run(self, fn, *args):
+        async with self._lock:
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def backoff(self, attempts):
+        """Seconds until the next retry after ``attempts`` failed ones."""
+        delay = min(self.max_backoff, self.retry * 2**attempts)
+        return delay * random.uniform(0.5, 1.5)
+
+    async def put(self, room, text):
+        await self._run(self._put, room, text)
+
+    async def due(self, limit=100):
+        """Return up to ``limit`` (id, room, text, attempts) due for a retry."""
+        return await self._run(self._due, limit)
+
+    async def done(self, ids):
+        """Forget messages that were delivered."""
+        await self._run(self._done, ids)
+
+    async def failed(self, rows):
+        """Schedule the next retry of (id, room, text, attempts) rows."""
+        await self._run(self._failed, rows)
+
+    async def size(self):
+        return await self._run(self._size)
+
+    def close(self):
+        self._db.close()
+
+    def _put(self, room, text):
+        now = self._clock()
+        with self._db:
+            self._db.execute(
+                "INSERT INTO spool (room, text, created, due) VALUES (?, ?, ?, ?)",
+                (room, text, now, now + self.backoff(0)),
+            )
+            expired = self._expire(now)
+            overflow = self._db.execute(
+                "DELETE FROM spool WHERE id <= "
+                "(SELECT id FROM spool ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_size,),
+            ).rowcount
+        if expired or overflow:
+            log.warning(
+                f"Dropped {expired} expired and {overflow} excess spooled message(s)."
+            )
+
+    def _due(self, limit):
+        now = self._clock()
+        with self._db:
+            expired = self._expire(now)
+        if expired:
+            log.warning(f"Dropped {expired} expired spooled message(s).")
+        return self._db.execute(
+            "SELECT id, room, text, attempts FROM spool WHERE due <= ? "
+            "ORDER BY id LIMIT ?",
+            (now, limit),
+        ).fetchall()
+
+    def _expire(self, now):
+        return self._db.execute(
+            "DELETE FROM spool WHERE created < ?", (now - self.max_age,)
+        ).rowcount
+
+    def _done(self, ids):
+        with self._db:
+            self._db.executemany("DELETE FROM spool WHERE id = ?", ((i,) for i in ids))
+
+    def _failed(self, rows):
+        now = self._clock()
+        with self._db:
+            self._db.executemany(
+                "UPDATE spool SET attempts = ?, due = ? WHERE id = ?",
+                (
+                    (attempts + 1, now + self.backoff(attempts + 1), row_id)
+                    for row_id, _, _, attempts in rows
+                ),
+            )
+
+    def _size(self):
+        return self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+# Memory keys of the sharded route storage.
+PROJECTS = "atlassian_route_projects"
+SHARD_PREFIX = "atlassian_route:"
+
+# Memory keys of the single blob routes were stored in before.
+LEGACY_ROUTES = "atlassian_routes"
+LEGACY_OPTIONS = "atlassian_route_options"
+
+
+def empty_shard():
+    return {"rooms": {}, "options": {}, "version": 0}
+
+
+class RouteStore:
+    """Routes persisted in opsdroid's memory, one shard per project.
+
+    Each shard holds the rooms of a project with their events and route
+    options, plus a version that is bumped on every change so in-memory
+    copies can tell whether one project needs refreshing. Changes to a
+    shard are serialized per project, so concurrent admin commands never
+    lose each other's updates, and only the shard touched is written back.
+    The list of projects is only rewritten when a project comes or goes.
+
+    Stores with a ``namespace`` keep their routes apart from the others,
+    only the store without one takes over routes from the legacy blob.
+    """
+
+    def __init__(self, memory, namespace=None):
+        self.memory = memory
+        self.namespace = namespace
+        self._projects_key = PROJECTS
+        self._shard_prefix = SHARD_PREFIX
+        if namespace is not None:
+            self._projects_key = f"{PROJECTS}:{namespace}"
+            self._shard_prefix = f"{SHARD_PREFIX}{namespace}:"
+        self._locks = {}
+        self._projects_lock = asyncio.Lock()
+
+    async def projects(self):
+        return await self.memory.get(self._projects_key) or []
+
+    async def get(self, project):
+        """Return the shard of ``project``, an empty one if it has no routes."""
+        shard = await self.memory.get(self._shard_prefix + project)
+        return shard if shard is not None else empty_shard()
+
+    async def load(self):
+        """Return the shards of all projects, migrating the legacy blob first."""
+        if self.namespace is None and await self.memory.get(PROJECTS) is None:
+            await self._migrate()
+        shards = {}
+        for project in await self.projects():
+            shard = await self.memory.get(self._shard_prefix + project)
+            if shard is not None:
+                shards[project] = shard
+        return shards
+
+    async def update(self, project, change):
+        """Apply ``change(shard)`` to the shard of ``project``.
+
+        The shard is only written back, with its version bumped, if
+        ``change`` returns a truthy value. Returns (shard, result).
+        """
+        shards, results = await self.update_many([project], lambda p, s: change(s))
+        return shards[project], results[project]
+
+    async def update_many(self, projects, change):
+        """Apply ``change(project, shard)`` to the shards of several projects.
+
+        Every changed shard is written once and the list of projects at most
+        once, however many projects are touched. Returns (shards, results),
+        both keyed by project.
+        """
+        projects = sorted(set(projects))
+        locks = [
+            self._locks.setdefault(project, asyncio.Lock()) for project in projects
+        ]
+        shards, results, appeared, vanished = {}, {}, set(), set()
+        for lock in locks:
+            await lock.acquire()
+        try:
+            for project in projects:
+                shard = shards[project] = await self.get(project)
+                existed = bool(shard["rooms"])
+                results[project] = change(project, shard)
+                if not results[project]:
+                    continue
+
+                shard["version"] += 1
+                for room in list(shard["options"]):
+                    if room not in shard["rooms"] or not shard["options"][room]:
+                        del shard["options"][room]
+                if shard["rooms"]:
+                    await self.memory.put(self._shard_prefix + project, shard)
+                else:
+                    await self.memory.delete(self._shard_prefix + project)
+                if existed and not shard["rooms"]:
+                    vanished.add(project)
+                elif shard["rooms"] and not existed:
+                    appeared.add(project)
+            if appeared or vanished:
+                await self._update_projects(appeared, vanished)
+        finally:
+            for lock in locks:
+                lock.release()
+        return shards, results
+
+    async def _update_projects(self, appeared, vanished):
+        async with self._projects_lock:
+            projects = set(await self.projects())
+            projects |= appeared
+            projects -= vanished
+            await self.memory.put(self._projects_key, sorted(projects))
+
+    async def _migrate(self):
+        routes = await self.memory.get(LEGACY_ROUTES) or {}
+        options = await self.memory.get(LEGACY_OPTIONS) or {}
+        for project, rooms in routes.items():
+            if not rooms:
+                continue
+            shard = empty_shard()
+            shard["rooms"] = rooms
+            shard["options"] = {
+                room: room_options
+                for room, room_options in options.get(project, {}).items()
+                if room in rooms and room_options
+            }
+            shard["version"] = 1
+            await self.memory.put(SHARD_PREFIX + project, shard)
+        await self.memory.put(PROJECTS, sorted(p for p, r in routes.items() if r))
+        if routes:
+            log.info(f"Migrated the routes of {len(routes)} project(s) to shards.")
+        await self.memory.delete(LEGACY_ROUTES)
+        await self.memory.delete(LEGACY_OPTIONS)
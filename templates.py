@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import re
+from urllib.parse import urlparse
+
+# Line breaks and the indentation around them, dropped from templates.
+WHITESPACE = re.compile(r"\s*\n\s*")
+
+# Message templates by name, in the syntax of the template engine.
+TEMPLATES = {
+    "issue_created": """
+        [JIRA] {user} created issue <a href="{url}">{key}</a>
+        <br>
+        <b>{summary}</b>
+        <pre>{description}</pre>
+    """,
+    "issue_edited": """
+        [JIRA] {user} edited issue <a href="{url}">{key}</a>
+        <br>
+        <b>{summary}</b>
+        <br>
+        {changes}{comment}
+    """,
+    "issue_digest": """
+        [JIRA] {users} edited issue <a href="{url}">{key}</a>
+        <br>
+        <b>{summary}</b>
+        <br>
+        {changes}{comments}
+    """,
+    "issue_commented": """
+        [JIRA] {user} {action} a comment on <a href="{url}">{key}</a>
+        <br>
+        <b>{summary}</b>
+        <br>
+        <pre>{comment}</pre>
+    """,
+    "issue_deleted": """
+        [JIRA] {user} deleted issue {key}
+        <br>
+        <b>{summary}</b>
+    """,
+    "comment_deleted": '[JIRA] {user} deleted a comment on <a href="{url}">{key}</a>',
+    "user_created": "[JIRA] User {user} was created",
+    "user_deleted": "[JIRA] User {user} was deleted",
+    "confluence_content": (
+        "[Confluence] {user} {action} {kind} "
+        '<a href="{url}">{title}</a> in {space}{version}'
+    ),
+    "confluence_comment": (
+        "[Confluence] {user} {action} a comment on "
+        '<a href="{url}">{title}</a> in {space}'
+    ),
+    "confluence_space": (
+        '[Confluence] {user} {action} space <a href="{url}">{title}</a> ({space})'
+    ),
+}
+
+
+class FormatEngine:
+    """Templates in ``str.format`` syntax, the default."""
+
+    def compile(self, source):
+        return source.format
+
+
+class Jinja2Engine:
+    """Templates in Jinja2 syntax, needs the jinja2 package."""
+
+    def __init__(self):
+        import jinja2
+
+        self._environment = jinja2.Environment(autoescape=False)
+
+    def compile(self, source):
+        return self._environment.from_string(source).render
+
+
+ENGINES = {"format": FormatEngine, "jinja2": Jinja2Engine}
+
+# The built-in templates are always rendered by the default engine, only
+# registered ones by the engine chosen with use_engine.
+_default_engine = _engine = FormatEngine()
+_registered = set()
+_compiled = {}
+
+
+def strip_whitespace(source):
+    """Join the lines of a template, dropping the indentation around them."""
+    return WHITESPACE.sub("", source.strip())
+
+
+def register_template(name, source):
+    """Replace the template ``name``, e.g. with a site specific one."""
+    TEMPLATES[name] = source
+    _registered.add(name)
+    _compiled.pop(name, None)
+
+
+def use_engine(engine):
+    """Render registered templates with ``engine``.
+
+    ``engine`` is a name from ENGINES or an object whose ``compile(source)``
+    returns a callable taking the fields as keyword arguments.
+    """
+    global _engine
+    _engine = ENGINES[engine]() if isinstance(engine, str) else engine
+    _compiled.clear()
+
+
+def render(name, **fields):
+    """Render the template ``name``, compiling it on first use."""
+    template = _compiled.get(name)
+    if template is None:
+        engine = _engine if name in _registered else _default_engine
+        template = engine.compile(strip_whitespace(TEMPLATES[name]))
+        _compiled[name] = template
+    return template(**fields)
+
+
+@functools.lru_cache(maxsize=64)
+def _base_url(origin):
+    url_parts = urlparse(origin)
+    return "{}://{}".format(url_parts.scheme, url_parts.hostname)
+
+
+def base_url(url):
+    """Return scheme and hostname of ``url``, parsed once per host."""
+    scheme, _, rest = url.partition("://")
+    return _base_url(scheme + "://" + rest.split("/", 1)[0])
+
+
+def browse_url(url, key):
+    """Return the browse URL of issue ``key``, given any REST URL of its site."""
+    return "{}/browse/{}".format(base_url(url), key)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import aiohttp
+
+from .issues import IssueService
+from .mirror import DEFAULT_MIRROR_SIZE, IssueMirror
+from .routing import RoutingTable
+from .store import RouteStore
+from .templates import base_url
+from .verify import Verifier
+
+# Separates the instance from the project in admin commands, as in acme/KEY.
+SEPARATOR = "/"
+
+# Settings a named instance takes from the skill unless it sets its own.
+INHERITED = (
+    "generic_max_length",
+    "issue_cache_size",
+    "issue_cache_ttl",
+    "issue_mirror",
+    "issue_mirror_size",
+)
+
+
+def hostname(url):
+    """Return the hostname of ``url``, parsed once per host."""
+    return base_url(url).partition("://")[2]
+
+
+class Instance:
+    """A Jira/Confluence site served by the skill.
+
+    Every instance has its own routes, credentials and generic message
+    length, while templates, delivery, queueing and deduplication are
+    shared by all of them.
+    Events are attributed to an instance by the webhook path they were
+    posted to or by the host of the URLs in their payload. The default
+    instance, named None, is configured at the top level of the skill and
+    keeps the memory keys used before there were instances.
+    """
+
+    def __init__(self, name, config, memory, http, events, global_events):
+        self.name = name
+        self.config = config
+        self.routing = RoutingTable(events, global_events)
+        self.route_store = RouteStore(memory, namespace=name)
+        self.generic_max_length = config.get("generic_max_length")
+        urls = list(config.get("urls", ()))
+        if config.get("JIRA_BASE_URL"):
+            urls.append(config["JIRA_BASE_URL"])
+        self.hosts = frozenset(hostname(url) for url in urls)
+        self.verifier = Verifier(
+            config.get("webhook_secret"), config.get("webhook_token")
+        )
+
+        self.mirror = None
+        if config.get("issue_mirror"):
+            self.mirror = IssueMirror(
+                config.get("issue_mirror_size", DEFAULT_MIRROR_SIZE)
+            )
+
+        self.issues = None
+        if config.get("JIRA_BASE_URL"):
+            auth = None
+            if config.get("JIRA_USER"):
+                auth = aiohttp.BasicAuth(
+                    config["JIRA_USER"], config.get("JIRA_API_TOKEN", "")
+                )
+            self.issues = IssueService(
+                http,
+                config["JIRA_BASE_URL"],
+                auth=auth,
+                maxsize=config.get("issue_cache_size", 1000),
+                ttl=config.get("issue_cache_ttl", 300),
+            )
+
+    def label(self, project):
+        """Return how ``project`` is called in replies and metrics."""
+        if self.name is None or project is None:
+            return project
+        return f"{self.name}{SEPARATOR}{project}"
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import hmac
+
+# Header Jira and Confluence sign webhooks with when they have a secret,
+# as in "sha256=<hex digest of the raw body>".
+SIGNATURE_HEADER = "X-Hub-Signature"
+
+# Query parameter carrying the shared token of webhooks that cannot sign.
+TOKEN_PARAMETER = "token"
+
+DIGESTS = {"sha256": hashlib.sha256, "sha1": hashlib.sha1}
+
+
+def valid_signature(secret, raw, signature):
+    """Tell whether ``signature`` is the HMAC of ``raw`` with ``secret``."""
+    method, _, digest = (signature or "").partition("=")
+    algorithm = DIGESTS.get(method.strip().lower())
+    if algorithm is None or not digest:
+        return False
+    expected = hmac.new(secret.encode(), raw, algorithm).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+def valid_token(token, given):
+    """Tell whether ``given`` is the shared ``token``, in constant time."""
+    if not given:
+        return False
+    return hmac.compare_digest(token.encode(), given.encode())
+
+
+class Verifier:
+    """Checks webhook requests of one instance against its secrets.
+
+    With a ``secret`` the raw body must be signed in SIGNATURE_HEADER, with
+    a ``token`` the query must carry it as TOKEN_PARAMETER. Either one is
+    enough when both are set. Without any, every request passes.
+    """
+
+    __slots__ = ("secret", "token")
+
+    def __init__(self, secret=None, token=None):
+        self.secret = secret
+        self.token = token
+
+    def __bool__(self):
+        return bool(self.secret or self.token)
+
+    def verify(self, request, raw):
+        if not self:
+            return True
+        if self.secret and valid_signature(
+            self.secret, raw, request.headers.get(SIGNATURE_HEADER)
+        ):
+            return True
+        return bool(self.token) and valid_token(
+            self.token, request.query.get(TOKEN_PARAMETER)
+        )
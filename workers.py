@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+log = logging.getLogger(name="errbot.plugins.atlassian")
+
+DROP_OLDEST = "drop_oldest"
+REJECT = "reject"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, REJECT, BLOCK)
+
+
+class EventQueue:
+    """Bounded queue of accepted webhook events and the workers draining it.
+
+    ``handler`` is awaited with every queued item. What happens when the
+    queue is full is decided by ``overflow``: drop the oldest queued event,
+    reject the new one or block the caller until there is room.
+    """
+
+    def __init__(self, handler, maxsize=1000, workers=4, overflow=BLOCK):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "Unknown overflow policy {0}, expected one of {1}.".format(
+                    overflow, ", ".join(OVERFLOW_POLICIES)
+                )
+            )
+        self.handler = handler
+        self.overflow = overflow
+        self._queue = asyncio.Queue(maxsize)
+        self._size = workers
+        self._workers = []
+
+    def start(self):
+        """Start the worker tasks, doing nothing if they already run."""
+        if self._workers:
+            return
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._size)]
+
+    async def put(self, item):
+        """Queue ``item``, returning False if it was rejected."""
+        if not self._workers:
+            self.start()
+
+        if self.overflow == BLOCK:
+            await self._queue.put(item)
+            return True
+
+        if self._queue.full():
+            if self.overflow == REJECT:
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            log.warning("Event queue is full, dropped the oldest event.")
+        self._queue.put_nowait(item)
+        return True
+
+    async def drain(self, timeout=None):
+        """Process what is still queued, then stop the workers."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(
+                f"Gave up draining the event queue, {self._queue.qsize()} "
+                "event(s) discarded."
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self.handler(*item)
+            except Exception:
+                log.exception("Processing a queued event failed.")
+            finally:
+                self._queue.task_done()